@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from tweet import Tweet
+
+
+def tweet_id_from_url(url):
+    """Numeric status ID from a tweet URL like https://twitter.com/user/status/123#m"""
+    try:
+        return int(url.split('/status/')[1].split('#')[0].split('?')[0].split('/')[0])
+    except (IndexError, ValueError):
+        return None
+
+
+class AccountStateStore:
+    """Per-account fetch state: newest tweet seen, HTTP validators and still-recent tweets"""
+    def __init__(self, state_file='account_state.json'):
+        self.state_file = state_file
+        self.accounts = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load saved state if available"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    self.accounts = json.load(f).get('accounts', {})
+                print(f"Loaded fetch state for {len(self.accounts)} accounts")
+            except Exception as e:
+                print(f"Error loading fetch state: {e}")
+                self.accounts = {}
+        return self.accounts
+
+    def save(self):
+        """Save state atomically so a crash never leaves a truncated file"""
+        tmp_file = f"{self.state_file}.tmp"
+        try:
+            with self._lock:
+                with open(tmp_file, 'w') as f:
+                    json.dump({
+                        'accounts': self.accounts,
+                        'updated_at': datetime.now(timezone.utc).isoformat()
+                    }, f, indent=1)
+            os.replace(tmp_file, self.state_file)
+            print(f"Saved fetch state for {len(self.accounts)} accounts")
+        except Exception as e:
+            print(f"Error saving fetch state: {e}")
+
+    def subset(self, usernames):
+        """State of just these accounts (for a shard's partial file)"""
+        with self._lock:
+            return {u: self.accounts[u] for u in usernames if u in self.accounts}
+
+    def merge(self, accounts):
+        """Take over state written by other runs (e.g. shards), replacing entries for the same accounts"""
+        with self._lock:
+            self.accounts.update(accounts)
+
+    def newest_id(self, username):
+        with self._lock:
+            return self.accounts.get(username, {}).get('newest_id')
+
+    def conditional_headers(self, username, instance):
+        """If-None-Match / If-Modified-Since headers, only valid for the instance that issued them"""
+        with self._lock:
+            validators = self.accounts.get(username, {}).get('validators', {}).get(instance, {})
+            headers = {}
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+            return headers
+
+    def recent_tweets(self, username):
+        """Tweets stored from earlier runs"""
+        with self._lock:
+            stored = self.accounts.get(username, {}).get('tweets', [])
+        return [Tweet.from_dict(t) for t in stored]
+
+    def update(self, username, instance, headers, newest_id, tweets, keep):
+        """Merge freshly parsed tweets with stored ones, keeping only those `keep` accepts"""
+        merged = {t.url: t for t in self.recent_tweets(username)}
+        merged.update({t.url: t for t in tweets})
+        recent = [t for t in merged.values() if keep(t)]
+
+        with self._lock:
+            state = self.accounts.setdefault(username, {})
+            if newest_id and newest_id > (state.get('newest_id') or 0):
+                state['newest_id'] = newest_id
+            state.setdefault('validators', {})[instance] = {
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified')
+            }
+            state['tweets'] = [t.to_dict() for t in recent]
+        return recent
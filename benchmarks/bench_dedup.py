@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate clustering (dedup.py): throughput at scale, and how well it
+recovers the planted duplicates compared with an exact pairwise scan.
+
+Usage: python benchmarks/bench_dedup.py [--sizes 1000,10000,100000] [--pairwise 2000] [--json]
+
+The synthetic corpus mixes unique tweets, variants of earlier stories (quote
+prefixes, "RT @x:", appended links, a word or two changed, other authors) and
+numbered threads. Every tweet carries its story id, so:
+
+  precision  collapsed tweets that landed in a cluster of their own story
+  recall     variants (and, separately, thread parts) collapsed into their story
+
+The pairwise baseline compares every pair by exact Jaccard (O(n^2)), so it
+finds every text variant LSH could; it has no thread rule. It only runs on the
+first --pairwise tweets, and its time is extrapolated to the larger sizes.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup import NearDuplicates, jaccard, shingles
+from tweet import Tweet
+
+PREFIXES = ['Huge:', 'This 👇', 'Wow.', 'BREAKING:', 'Worth reading:', 'h/t @someone', 'RT @newsbot:']
+SUFFIXES = ['https://t.co/abc123', '🔥', 'Thoughts?', '(via @lab)', 'pic.twitter.com/xyz']
+
+
+def corpus(count, variant_rate=0.3, thread_rate=0.05, seed=1):
+    """count synthetic tweets as (Tweet, story id, planted duplicate kind: None, 'variant' or 'thread')"""
+    rng = random.Random(seed)
+    vocab = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 9)))
+             for _ in range(5000)]
+    stories = 0
+    texts = []  # (story id, words) of stories with one shared text
+    now = time.time()
+    out = []
+    while len(out) < count:
+        roll = rng.random()
+        author = f"user{rng.randint(0, 20000)}"
+        ts = now - rng.randint(0, 86400)
+        if texts and roll < variant_rate:
+            story, words = rng.choice(texts)
+            words = list(words)
+            for _ in range(rng.randint(0, 2)):
+                words[rng.randrange(len(words))] = rng.choice(vocab)
+            text = ' '.join(words)
+            if rng.random() < 0.5:
+                text = f"{rng.choice(PREFIXES)} {text}"
+            if rng.random() < 0.5:
+                text = f"{text} {rng.choice(SUFFIXES)}"
+            duplicate = 'variant'
+        elif roll < variant_rate + thread_rate:
+            # A numbered thread: parts share no text, only author, markers and time
+            story = stories
+            stories += 1
+            parts = rng.randint(2, 5)
+            for part in range(1, parts + 1):
+                if len(out) >= count:
+                    break
+                text = f"{part}/ " + ' '.join(rng.choice(vocab) for _ in range(rng.randint(10, 30)))
+                out.append((Tweet(author, text, f"https://x.com/{author}/status/{len(out)}", rng.randint(0, 5000),
+                                  rng.randint(0, 500), rng.randint(0, 200), ts + part * 60), story, 'thread' if part > 1 else None))
+            continue
+        else:
+            story = stories
+            stories += 1
+            words = [rng.choice(vocab) for _ in range(rng.randint(8, 35))]
+            texts.append((story, words))
+            text = ' '.join(words)
+            duplicate = None
+        out.append((Tweet(author, text, f"https://x.com/{author}/status/{len(out)}", rng.randint(0, 5000),
+                          rng.randint(0, 500), rng.randint(0, 200), ts), story, duplicate))
+    return out
+
+
+def evaluate(items, assignment):
+    """precision and per-kind recall of cluster assignments against the planted story ids"""
+    cluster_story = {}
+    collapsed = correct = 0
+    planted = {'variant': 0, 'thread': 0}
+    recovered = {'variant': 0, 'thread': 0}
+    for (_, story, kind), cluster in zip(items, assignment):
+        if kind:
+            planted[kind] += 1
+        if cluster in cluster_story:
+            collapsed += 1
+            if cluster_story[cluster] == story:
+                correct += 1
+                if kind:
+                    recovered[kind] += 1
+        else:
+            cluster_story[cluster] = story
+    return {
+        'precision': round(correct / collapsed if collapsed else 1.0, 4),
+        'variant_recall': round(recovered['variant'] / planted['variant'] if planted['variant'] else 1.0, 4),
+        'thread_recall': round(recovered['thread'] / planted['thread'] if planted['thread'] else 1.0, 4)
+    }
+
+
+def run_lsh(items):
+    clusters = NearDuplicates()
+    started = time.perf_counter()
+    assignment = [clusters.add(tweet) for tweet, _, _ in items]
+    elapsed = time.perf_counter() - started
+    return {
+        'tweets': len(items),
+        'seconds': round(elapsed, 3),
+        'tweets_per_second': round(len(items) / elapsed),
+        'stories': len(clusters),
+        'collapsed': clusters.collapsed,
+        **evaluate(items, assignment)
+    }
+
+
+def run_pairwise(items, threshold=0.5):
+    """Exact baseline: each tweet joins the most similar earlier cluster head"""
+    started = time.perf_counter()
+    heads = []  # (cluster, shingles)
+    assignment = []
+    for tweet, _, _ in items:
+        hashes = shingles(tweet.text)
+        best, best_similarity = None, threshold
+        for cluster, head in heads:
+            similarity = jaccard(hashes, head)
+            if similarity >= best_similarity:
+                best, best_similarity = cluster, similarity
+        if best is None:
+            best = len(heads)
+            heads.append((best, hashes))
+        assignment.append(best)
+    elapsed = time.perf_counter() - started
+    return {
+        'tweets': len(items),
+        'seconds': round(elapsed, 3),
+        'stories': len(heads),
+        **evaluate(items, assignment)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark near-duplicate clustering')
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--pairwise', type=int, default=2000,
+                        help='Tweets to run the O(n^2) pairwise baseline on (0 to skip)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    items = corpus(max(sizes + [args.pairwise]), seed=args.seed)
+    results = {'lsh': [run_lsh(items[:size]) for size in sizes]}
+    if args.pairwise:
+        baseline = run_pairwise(items[:args.pairwise])
+        # Pairwise cost grows with n * stories, so scale quadratically
+        baseline['projected_seconds'] = {
+            size: round(baseline['seconds'] * (size / args.pairwise) ** 2, 1) for size in sizes
+        }
+        baseline['lsh_on_same_tweets'] = run_lsh(items[:args.pairwise])
+        results['pairwise'] = baseline
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'tweets':>10}{'seconds':>10}{'tweets/s':>12}{'stories':>10}{'precision':>11}"
+          f"{'variants':>10}{'threads':>9}")
+    for r in results['lsh']:
+        print(f"{r['tweets']:>10,}{r['seconds']:>10.3f}{r['tweets_per_second']:>12,}{r['stories']:>10,}"
+              f"{r['precision']:>11.4f}{r['variant_recall']:>10.4f}{r['thread_recall']:>9.4f}")
+    if args.pairwise:
+        b = results['pairwise']
+        lsh = b['lsh_on_same_tweets']
+        print(f"\nFirst {b['tweets']:,} tweets, text variants found: pairwise {b['variant_recall']:.4f} "
+              f"in {b['seconds']:.3f}s, LSH {lsh['variant_recall']:.4f} in {lsh['seconds']:.3f}s")
+        for size, seconds in b['projected_seconds'].items():
+            print(f"  pairwise at {size:,} tweets ≈ {seconds:,.1f}s")
+
+
+if __name__ == '__main__':
+    main()
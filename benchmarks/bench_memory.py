@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Memory per tweet: the old eight-key dict (with a datetime) vs the slotted Tweet record.
+
+Usage: python benchmarks/bench_memory.py [--count 100000] [--json]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tweet import Tweet
+
+
+def synthetic_fields(count, seed=1):
+    """Raw field values for count tweets; strings are built fresh for every tweet"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).timestamp()
+    for i in range(count):
+        author = f"user{rng.randint(0, 5000)}"
+        yield (
+            author,
+            f"Tweet {i} about model training and inference at scale " * rng.randint(1, 4),
+            f"https://twitter.com/{author}/status/{1846000000000000000 + i}#m",
+            rng.randint(0, 50000),
+            rng.randint(0, 5000),
+            rng.randint(0, 2000),
+            now - rng.randint(0, 86400)
+        )
+
+
+def as_dict(fields):
+    author, text, url, likes, retweets, replies, ts = fields
+    return {
+        'author': author,
+        'text': text,
+        'url': url,
+        'likes': likes,
+        'retweets': retweets,
+        'replies': replies,
+        'created_at': datetime.fromtimestamp(ts, timezone.utc),
+        'engagement': likes + (retweets * 2) + replies
+    }
+
+
+def as_record(fields):
+    return Tweet(*fields)
+
+
+def measure(build, count):
+    """Bytes allocated per tweet while holding count of them"""
+    gc.collect()
+    tracemalloc.start()
+    tweets = [build(f) for f in synthetic_fields(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tweets
+    return current / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-tweet memory of dicts and Tweet records')
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    # Strings are identical in both layouts, so also measure them alone
+    strings = measure(lambda f: (f[0], f[1], f[2]), args.count) - sys.getsizeof(('', '', ''))
+    results = {
+        'count': args.count,
+        'dict_bytes_per_tweet': round(measure(as_dict, args.count), 1),
+        'record_bytes_per_tweet': round(measure(as_record, args.count), 1),
+        'shared_string_bytes_per_tweet': round(strings, 1)
+    }
+    results['saving_percent'] = round(
+        100 * (1 - results['record_bytes_per_tweet'] / results['dict_bytes_per_tweet']), 1
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.count:,} synthetic tweets")
+    print(f"  dict:   {results['dict_bytes_per_tweet']:>8.1f} bytes/tweet")
+    print(f"  Tweet:  {results['record_bytes_per_tweet']:>8.1f} bytes/tweet")
+    print(f"  (of which text/url/author strings: {results['shared_string_bytes_per_tweet']:.1f})")
+    print(f"  saving: {results['saving_percent']}%")
+
+
+if __name__ == '__main__':
+    main()
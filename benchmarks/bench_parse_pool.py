@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Fetch/parse pipeline throughput on the fixture pages: parsing on the fetch
+threads vs in a ParsePool of worker processes (parse_pool.py).
+
+Usage: python benchmarks/bench_parse_pool.py [--pages 400] [--threads 8] [--latency 0.02]
+                                             [--parsers lxml,bs4] [--workers 1,2,4] [--json]
+
+Each of --threads fetcher threads takes profile pages from the fixtures,
+sleeps --latency seconds to stand in for the network (releasing the GIL,
+like a socket read), then parses the page into tweet records. The gain from
+worker processes grows with the cores available: with one core there is
+nothing to parallelise and the pool only adds pickling overhead.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nitter_parser import get_backend
+from parse_pool import ParsePool, parse_timeline
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def run(pages, threads, latency, parse):
+    """Pages per second through `threads` fetchers that each sleep, then parse"""
+    def fetch_and_parse(html):
+        time.sleep(latency)
+        return len(parse(html).tweets)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        tweets = sum(executor.map(fetch_and_parse, pages))
+    elapsed = time.perf_counter() - started
+    return len(pages) / elapsed, tweets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parsing on fetch threads vs a process pool')
+    parser.add_argument('--pages', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=8, help='Fetcher threads')
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated network time per page (s)')
+    parser.add_argument('--parsers', default='lxml,bs4')
+    parser.add_argument('--workers', default=None, help='Comma-separated pool sizes (default: 1 and the CPU count)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    fixtures = [open(path, 'rb').read() for path in sorted(glob.glob(os.path.join(FIXTURES, 'profile_*.html')))]
+    pages = [fixtures[i % len(fixtures)] for i in range(args.pages)]
+    cutoff = 0  # keep every tweet, so each page is parsed in full
+    cpus = os.cpu_count() or 1
+    sizes = sorted({int(w) for w in args.workers.split(',')} if args.workers else {1, cpus})
+
+    results = []
+    for name in args.parsers.split(','):
+        backend = get_backend(name)
+        inline_rate, expected = run(pages, args.threads, args.latency,
+                                    lambda html: parse_timeline(backend, html, 'bench', None, cutoff, 10 ** 6))
+        results.append({'parser': name, 'mode': 'fetch threads', 'workers': 0,
+                        'pages_per_second': round(inline_rate, 1), 'speedup': 1.0})
+        for workers in sizes:
+            pool = ParsePool(name, workers)
+            pool.parse(pages[0], 'bench', None, cutoff, 10 ** 6)  # start the workers outside the timing
+            rate, tweets = run(pages, args.threads, args.latency,
+                               lambda html: pool.parse(html, 'bench', None, cutoff, 10 ** 6))
+            pool.close()
+            if tweets != expected:
+                print(f"! {name} with {workers} workers parsed {tweets} tweets, expected {expected}", file=sys.stderr)
+            results.append({'parser': name, 'mode': 'process pool', 'workers': workers,
+                            'pages_per_second': round(rate, 1), 'speedup': round(rate / inline_rate, 2)})
+
+    if args.json:
+        print(json.dumps({'cpus': cpus, 'pages': args.pages, 'threads': args.threads,
+                          'latency': args.latency, 'results': results}, indent=2))
+        return
+
+    print(f"{cpus} CPU(s), {args.pages} pages, {args.threads} fetcher threads, {args.latency * 1000:.0f} ms simulated latency")
+    print(f"{'parser':<10}{'mode':<16}{'workers':>8}{'pages/s':>10}{'speedup':>9}")
+    for r in results:
+        print(f"{r['parser']:<10}{r['mode']:<16}{r['workers']:>8}{r['pages_per_second']:>10.1f}{r['speedup']:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the Nitter parser backends on the saved HTML fixtures.
+
+Usage: python benchmarks/bench_parsers.py [--repeat 50] [--items 3] [--json]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nitter_parser import BACKENDS
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def extract_all(backend, html, max_items):
+    """Parse a profile page the way the scraper does, touching every field"""
+    rows = []
+    for item in backend.timeline_items(html, max_items):
+        rows.append((
+            backend.is_retweet(item), backend.is_pinned(item), backend.link(item),
+            backend.text(item), backend.stats(item), backend.date_title(item), backend.date_text(item)
+        ))
+    return rows
+
+
+def time_call(fn, repeat):
+    """Best-of-3 mean milliseconds per call"""
+    best = None
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Nitter parser backends')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--items', type=int, default=3, help='Timeline items to extract per page')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    profiles = [open(path, 'rb').read() for path in sorted(glob.glob(os.path.join(FIXTURES, 'profile_*.html')))]
+    members_page = open(os.path.join(FIXTURES, 'list_members.html'), 'rb').read()
+
+    results = {}
+    reference = None
+    for name, cls in BACKENDS.items():
+        try:
+            backend = cls()
+        except ImportError:
+            print(f"- {name}: not installed, skipped", file=sys.stderr)
+            continue
+
+        output = [extract_all(backend, html, args.items) for html in profiles]
+        if reference is None:
+            reference = output
+        elif output != reference:
+            print(f"! {name}: output differs from {next(iter(results))}", file=sys.stderr)
+
+        results[name] = {
+            'profile_first_n_ms': time_call(lambda: [extract_all(backend, h, args.items) for h in profiles], args.repeat) / len(profiles),
+            'profile_all_items_ms': time_call(lambda: [extract_all(backend, h, 10 ** 6) for h in profiles], args.repeat) / len(profiles),
+            'list_members_ms': time_call(lambda: backend.usernames(members_page), args.repeat)
+        }
+
+    if args.json:
+        print(json.dumps({'items': args.items, 'repeat': args.repeat, 'results': results}, indent=2))
+        return
+
+    print(f"{'backend':<12}{f'first {args.items} items':>16}{'all items':>12}{'list page':>12}  (ms/page)")
+    for name, r in results.items():
+        print(f"{name:<12}{r['profile_first_n_ms']:>16.2f}{r['profile_all_items_ms']:>12.2f}{r['list_members_ms']:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark: runs generate_rss.main() against local stand-in
+Nitter servers (see nitter_server.py) and reports throughput, request
+latency, parse time and peak memory as JSON.
+
+Usage:
+    python benchmarks/bench_pipeline.py --accounts 200 --instances 3 --latency 0.05 \\
+        --rate-429 0.02 --concurrency 8 --output bench_results.json
+
+--runs 2 repeats the pipeline in the same working directory, so the second
+run measures the warm path (member cache and per-account state present).
+The response cache is off unless --response-cache is given, in which case
+the second run replays the first one's pages from disk.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generate_rss
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nitter_server.py')
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def start_servers(args):
+    """Start one stand-in server per simulated mirror and return (processes, urls)"""
+    processes, urls = [], []
+    for i in range(args.instances):
+        cmd = [
+            sys.executable, SERVER,
+            '--accounts', str(args.accounts),
+            '--page-size', str(args.page_size),
+            '--latency', str(args.latency),
+            '--error-rate', str(args.error_rate),
+            '--rate-429', str(args.rate_429),
+            '--seed', str(args.seed + i)
+        ]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+        processes.append(process)
+        urls.append(process.stdout.readline().strip())
+    return processes, urls
+
+
+def server_stats(urls):
+    totals = {}
+    for url in urls:
+        with urllib.request.urlopen(f"{url}/__stats") as response:
+            for status, count in json.load(response).items():
+                totals[status] = totals.get(status, 0) + count
+    return totals
+
+
+def run_once(args, urls):
+    """Run the full pipeline once and collect its metrics"""
+    argv = [
+        '--concurrency', str(args.concurrency),
+        '--parser', args.parser,
+        '--instances', ','.join(urls),
+        '--host-rate', str(args.host_rate)
+    ]
+    if not args.response_cache:
+        argv.append('--no-cache')
+    if args.parse_workers:
+        argv += ['--parse-workers', args.parse_workers]
+    log = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else log):
+        generator = generate_rss.main(argv)
+    wall = time.perf_counter() - started
+
+    accounts = len(generator.accounts)
+    report = generator.report.to_dict()
+    http = report['stages'].get('http', {})
+    parse = report['stages'].get('parse', {})
+    feed_bytes = os.path.getsize('tech_ai_twitter.xml') if os.path.exists('tech_ai_twitter.xml') else 0
+
+    return {
+        'wall_seconds': round(wall, 3),
+        'fetch_seconds': round(generator.fetch_seconds, 3),
+        'accounts': accounts,
+        'accounts_per_second': round(accounts / generator.fetch_seconds, 2) if generator.fetch_seconds else 0.0,
+        'requests': http.get('count', 0),
+        'request_latency_p50_ms': http.get('p50_ms', 0.0),
+        'request_latency_p95_ms': http.get('p95_ms', 0.0),
+        'pages_parsed': parse.get('count', 0),
+        'parse_ms_per_page': parse.get('mean_ms', 0.0),
+        'parse_p95_ms': parse.get('p95_ms', 0.0),
+        'feed_bytes': feed_bytes,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'report': report
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the RSS pipeline against local Nitter stand-ins')
+    parser.add_argument('--accounts', type=int, default=200)
+    parser.add_argument('--instances', type=int, default=3, help='Number of stand-in mirrors to start')
+    parser.add_argument('--page-size', type=int, default=20, help='List members per page (0: all on one page)')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--host-rate', type=float, default=50.0,
+                        help='Per-instance request rate passed to the generator')
+    parser.add_argument('--parser', default='lxml')
+    parser.add_argument('--parse-workers', metavar='N|auto',
+                        help='Parse in worker processes (generate_rss.py --parse-workers)')
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--response-cache', action='store_true',
+                        help='Let the generator use its on-disk response cache between runs')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write results JSON to this file as well as stdout')
+    parser.add_argument('--verbose', action='store_true', help="Show the generator's own output")
+    args = parser.parse_args()
+
+    processes, urls = start_servers(args)
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory(prefix='rss-bench-') as workdir:
+            # Cache, state and feed files land in a scratch directory
+            os.chdir(workdir)
+            runs = [run_once(args, urls) for _ in range(args.runs)]
+            os.chdir(cwd)
+        statuses = server_stats(urls)
+    finally:
+        os.chdir(cwd)
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    results = {
+        'benchmark': 'pipeline',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('output', 'verbose')},
+        'runs': runs,
+        'server_status_counts': statuses
+    }
+
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
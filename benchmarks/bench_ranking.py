@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Ranking: the streaming heap (ranking.TopK) vs the NumPy columnar batch
+(columnar.ColumnarRanking), by number of tweets.
+
+Usage: python benchmarks/bench_ranking.py [--sizes 1000,100000,500000] [--k 100] [--json]
+
+Per size and score it times (best of 3):
+
+  heap        add() every tweet to TopK, then snapshot()
+  col add     add() every tweet to ColumnarRanking (the run's path), then snapshot()
+  col bulk    extend() with all tweets at once (the digest path), then snapshot()
+  col rank    snapshot() alone: the vectorised scoring, caps and argpartition
+
+and checks the two rankers return the same top K for the scores they share.
+zscore, relative and the per-list quota only exist in the columnar ranker.
+Exits non-zero if any top K differs.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_memory import synthetic_fields
+from columnar import ColumnarRanking
+from ranking import TopK, engagement_score, time_decayed
+from tweet import Tweet
+
+
+def best_of(fn, runs=3):
+    best, result = None, None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def one_by_one(make, tweets):
+    def run():
+        ranking = make()
+        for tweet in tweets:
+            ranking.add(tweet)
+        return ranking.snapshot()
+    return run
+
+
+def bulk(make, tweets):
+    def run():
+        ranking = make()
+        ranking.extend(tweets)
+        return ranking.snapshot()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark heap vs columnar ranking')
+    parser.add_argument('--sizes', default='1000,100000,500000')
+    parser.add_argument('--k', type=int, default=100)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        tweets = [Tweet(*fields) for fields in synthetic_fields(size)]
+        now = max(t.timestamp for t in tweets)
+        groups = {t.author: int(t.author[4:]) % 5 for t in tweets}
+        cases = [
+            ('engagement', lambda: TopK(args.k, engagement_score), lambda: ColumnarRanking(args.k, 'engagement')),
+            ('decayed', lambda: TopK(args.k, time_decayed(now=now)), lambda: ColumnarRanking(args.k, 'decayed', now=now)),
+            ('max_per_author=2', lambda: TopK(args.k, engagement_score, 2),
+             lambda: ColumnarRanking(args.k, 'engagement', 2)),
+            ('zscore', None, lambda: ColumnarRanking(args.k, 'zscore')),
+            ('relative', None, lambda: ColumnarRanking(args.k, 'relative')),
+            ('list_quota', None, lambda: ColumnarRanking(args.k, 'engagement', groups=groups, group_quota=args.k // 5)),
+        ]
+        for name, heap, columnar in cases:
+            row = {'tweets': size, 'score': name}
+            col_add, col_top = best_of(one_by_one(columnar, tweets))
+            row['col_add_seconds'] = round(col_add, 4)
+            row['col_bulk_seconds'] = round(best_of(bulk(columnar, tweets))[0], 4)
+            filled = columnar()
+            filled.extend(tweets)
+            row['col_rank_seconds'] = round(best_of(filled.snapshot)[0], 4)
+            if heap:
+                heap_s, heap_top = best_of(one_by_one(heap, tweets))
+                row['heap_seconds'] = round(heap_s, 4)
+                row['same_top_k'] = [t.url for t in heap_top] == [t.url for t in col_top]
+            results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'tweets':>9}  {'score':<18}{'heap':>9}{'col add':>9}{'col bulk':>10}{'col rank':>10}{'same':>7}")
+        for r in results:
+            heap = f"{r['heap_seconds']:.3f}" if 'heap_seconds' in r else '-'
+            same = str(r['same_top_k']) if 'same_top_k' in r else '-'
+            print(f"{r['tweets']:>9,}  {r['score']:<18}{heap:>9}{r['col_add_seconds']:>9.3f}"
+                  f"{r['col_bulk_seconds']:>10.3f}{r['col_rank_seconds']:>10.4f}{same:>7}")
+    sys.exit(0 if all(r.get('same_top_k', True) for r in results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Feed writing: the streaming lxml writer (rss_writer.py) vs feedgen, by entry count.
+
+Usage: python benchmarks/bench_rss.py [--sizes 100,10000,100000] [--json]
+
+Each (writer, size) runs in a fresh subprocess so peak RSS is its own; the
+reported memory is the peak above the process's size once the tweets exist.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_single(writer, size):
+    """Write one feed in this process and print its metrics as JSON"""
+    from bench_memory import synthetic_fields
+    from generate_rss import TwitterListRSSGenerator
+    from tweet import Tweet
+
+    tweets = [Tweet(*fields) for fields in synthetic_fields(size)]
+    generator = TwitterListRSSGenerator(rss_writer=writer, store_path=None, cache_dir=None, checkpoint_path=None)
+    baseline = rss_mb()
+
+    with tempfile.TemporaryDirectory(prefix='rss-bench-') as workdir:
+        output = os.path.join(workdir, 'feed.xml')
+        started = time.perf_counter()
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                generator.generate_rss(tweets, output_file=output)
+            finally:
+                sys.stdout = stdout
+        elapsed = time.perf_counter() - started
+        size_bytes = os.path.getsize(output)
+
+    print(json.dumps({
+        'writer': writer,
+        'entries': size,
+        'seconds': round(elapsed, 4),
+        'entries_per_second': round(size / elapsed) if elapsed else 0,
+        'peak_extra_mb': round(rss_mb() - baseline, 1),
+        'feed_mb': round(size_bytes / 1024 / 1024, 2)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the RSS writers')
+    parser.add_argument('--sizes', default='100,10000,100000')
+    parser.add_argument('--writers', default='stream,feedgen')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--single', nargs=2, metavar=('WRITER', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        return run_single(args.single[0], int(args.single[1]))
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        for writer in args.writers.split(','):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--single', writer, str(size)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'writer':<10}{'entries':>10}{'seconds':>10}{'entries/s':>12}{'peak +MB':>10}{'feed MB':>10}")
+    for r in results:
+        print(f"{r['writer']:<10}{r['entries']:>10,}{r['seconds']:>10.3f}{r['entries_per_second']:>12,}"
+              f"{r['peak_extra_mb']:>10.1f}{r['feed_mb']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Cold start of the CLI: how long each command takes in a fresh interpreter, and
+what it imports.
+
+Usage: python benchmarks/bench_startup.py [--runs 7] [--tweets 2000] [--max-ms 100] [--json]
+
+Each command runs --runs times in a new subprocess (in a temp directory with a
+store of --tweets synthetic tweets) and the median wall time is reported, also
+net of a bare `python -c pass`. `render` is also run once under
+`python -X importtime` to list its slowest imports; it must not load any of
+HEAVY (the HTTP stack, the HTML parsers, feedgen, the feed server, worker
+processes, NumPy). Exits 1 if it does, or if `render` (the default command,
+near-duplicates collapsed, as CI runs it) takes more than --max-ms over the
+bare interpreter.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCRIPT = os.path.join(ROOT, 'generate_rss.py')
+ENV = {**os.environ, 'PYTHONPATH': ROOT}
+
+# Modules `render` has no use for; each costs 10-150ms to import
+HEAVY = ['requests', 'urllib3', 'bs4', 'lxml.html', 'selectolax', 'feedgen', 'http.server',
+         'multiprocessing', 'numpy']
+
+COMMANDS = {
+    'python': ['-c', 'pass'],
+    'import': ['-c', 'import generate_rss'],
+    'eager imports': ['-c', 'import requests, bs4, lxml.html, feedgen.feed, http.server, multiprocessing'],
+    'render --help': [SCRIPT, 'render', '--help'],
+    'render --no-dedup': [SCRIPT, 'render', '--no-dedup', '--output', 'feed.xml'],
+    'render': [SCRIPT, 'render', '--output', 'feed.xml'],
+}
+# Skipped (shown as '-') where the dependencies aren't all installed
+OPTIONAL = {'eager imports'}
+
+
+def make_store(workdir, count):
+    from bench_memory import synthetic_fields
+    from tweet import Tweet
+    from tweet_store import TweetStore
+
+    store = TweetStore(os.path.join(workdir, 'tweets.db'))
+    store.upsert([Tweet(*fields) for fields in synthetic_fields(count)])
+    # As the fetch or merge run that stored them would
+    store.assign_stories()
+    store.close()
+
+
+def time_command(args, workdir, runs, optional=False):
+    """Median and minimum wall time of `python <args>` in ms (None if an optional command fails)"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, *args], cwd=workdir, env=ENV, check=not optional,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode:
+            return None
+        times.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(times), 1), round(min(times), 1)
+
+
+def import_profile(args, workdir):
+    """{module: (cumulative us, imported at top level)} from python -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=workdir, env=ENV, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        # One space after the bar, plus two per level of nesting
+        modules[name.strip()] = (int(cumulative_us), not name[1:].startswith(' '))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CLI cold start')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--tweets', type=int, default=2000, help='Tweets in the store `render` reads')
+    parser.add_argument('--max-ms', type=float, default=100,
+                        help='Fail if `render` takes longer than this over a bare interpreter')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports of `render` to list')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='startup-bench-') as workdir:
+        make_store(workdir, args.tweets)
+        timings = {name: time_command(command, workdir, args.runs, name in OPTIONAL)
+                   for name, command in COMMANDS.items()}
+        baseline_modules = import_profile(COMMANDS['python'], workdir)
+        modules = import_profile(COMMANDS['render'], workdir)
+
+    baseline = timings['python'][0]
+    loaded = [name for name in HEAVY if name in modules]
+    # Interpreter startup (site and what it pulls in) is in the baseline already
+    slowest = sorted(((name, cumulative) for name, (cumulative, top_level) in modules.items()
+                      if top_level and name not in baseline_modules),
+                     key=lambda item: -item[1])
+    results = {
+        'runs': args.runs,
+        'tweets': args.tweets,
+        'commands': {
+            name: {'median_ms': row[0], 'min_ms': row[1], 'over_python_ms': round(row[0] - baseline, 1)}
+            for name, row in timings.items() if row
+        },
+        'skipped': [name for name, row in timings.items() if not row],
+        'render_imports_ms': round(sum(cumulative for _, cumulative in slowest) / 1000, 1),
+        'render_slowest_imports_ms': {name: round(cumulative / 1000, 1) for name, cumulative in slowest[:args.top]},
+        'render_heavy_imports': loaded
+    }
+    render_overhead = results['commands']['render']['over_python_ms']
+    failed = bool(loaded) or render_overhead > args.max_ms
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'command':<20}{'median ms':>11}{'min ms':>9}{'over python':>13}")
+        for name, row in results['commands'].items():
+            print(f"{name:<20}{row['median_ms']:>11.1f}{row['min_ms']:>9.1f}{row['over_python_ms']:>13.1f}")
+        for name in results['skipped']:
+            print(f"{name:<20}{'-':>11}{'-':>9}{'-':>13}  (not every dependency is installed)")
+        print(f"\n`render` imports: {results['render_imports_ms']:.1f}ms (under -X importtime), slowest:")
+        for name, ms in results['render_slowest_imports_ms'].items():
+            print(f"  {name:<24}{ms:>7.1f}ms")
+        print(f"\nHeavy modules loaded by `render`: {', '.join(loaded) or 'none'}")
+        print(f"`render` over a bare interpreter: {render_overhead:.1f}ms "
+              f"({'✗ over' if render_overhead > args.max_ms else '✓ within'} {args.max_ms:g}ms)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Correctness table and throughput of the date / count parsers in nitter_values.py,
+against the strptime + int() code they replaced.
+
+Usage: python benchmarks/bench_values.py [--count 100000] [--json]
+
+Exits non-zero if any row of the table parses wrong, so it doubles as a check.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nitter_values import parse_count, parse_date_title, parse_relative_date
+
+
+def epoch(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+NOW = epoch(2024, 10, 5, 12, 0)
+
+# (function, input, expected)
+CASES = [
+    (parse_date_title, 'Oct 3, 2024 · 5:07 PM UTC', epoch(2024, 10, 3, 17, 7)),
+    (parse_date_title, 'Jan 1, 2024 · 12:00 AM UTC', epoch(2024, 1, 1, 0, 0)),
+    (parse_date_title, 'Jan 1, 2024 · 12:30 PM UTC', epoch(2024, 1, 1, 12, 30)),
+    (parse_date_title, 'Feb 29, 2024 · 11:59 PM UTC', epoch(2024, 2, 29, 23, 59)),
+    (parse_date_title, 'Sept 9, 2024 · 9:05 AM UTC', epoch(2024, 9, 9, 9, 5)),
+    (parse_date_title, 'Feb 30, 2024 · 1:00 PM UTC', None),
+    (parse_date_title, 'Oct 3, 2024 · 13:07 PM UTC', None),
+    (parse_date_title, '', None),
+    (parse_date_title, 'yesterday', None),
+    (lambda s: parse_relative_date(s, NOW), 'now', NOW),
+    (lambda s: parse_relative_date(s, NOW), '45s', NOW - 45),
+    (lambda s: parse_relative_date(s, NOW), '5m', NOW - 300),
+    (lambda s: parse_relative_date(s, NOW), '5h', NOW - 5 * 3600),
+    (lambda s: parse_relative_date(s, NOW), '2d', NOW - 2 * 86400),
+    (lambda s: parse_relative_date(s, NOW), 'Oct 3', epoch(2024, 10, 3)),
+    (lambda s: parse_relative_date(s, NOW), 'Dec 25', epoch(2023, 12, 25)),
+    (lambda s: parse_relative_date(s, NOW), 'Oct 3, 2023', epoch(2023, 10, 3)),
+    (lambda s: parse_relative_date(s, NOW), 'Smarch 3', None),
+    (parse_count, '0', 0),
+    (parse_count, '42', 42),
+    (parse_count, ' 1,234 ', 1234),
+    (parse_count, '1.2K', 1200),
+    (parse_count, '12.5k', 12500),
+    (parse_count, '3M', 3000000),
+    (parse_count, '1.05B', 1050000000),
+    (parse_count, '', 0),
+    (parse_count, None, 0),
+    (parse_count, 'n/a', 0),
+]
+
+
+def old_date(title):
+    try:
+        created_at = datetime.strptime(title, '%b %d, %Y · %I:%M %p UTC')
+        return created_at.replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def old_count(text):
+    try:
+        return int(text.strip().replace(',', ''))
+    except (AttributeError, ValueError):
+        return 0
+
+
+def check():
+    failures = 0
+    for fn, text, expected in CASES:
+        got = fn(text)
+        if got != expected:
+            failures += 1
+            print(f"✗ {getattr(fn, '__name__', 'parse_relative_date')}({text!r}) = {got!r}, expected {expected!r}")
+    print(f"{len(CASES) - failures}/{len(CASES)} cases correct", file=sys.stderr)
+    return failures
+
+
+def rate(fn, values):
+    """Calls per second over the whole list (best of 3)"""
+    best = None
+    for _ in range(3):
+        parse_date_title.cache_clear()
+        started = time.perf_counter()
+        for value in values:
+            fn(value)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(values) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Nitter date and count parsing')
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    failures = check()
+
+    rng = random.Random(args.seed)
+    start = epoch(2020, 1, 1)
+    titles = [
+        datetime.fromtimestamp(start + rng.randrange(5 * 365 * 86400), timezone.utc).strftime('%b %-d, %Y · %-I:%M %p UTC')
+        for _ in range(args.count)
+    ]
+    # A run sees each title a few times (pinned tweets, overlapping pages)
+    repeated = [titles[i % 1000] for i in range(args.count)]
+    counts = [rng.choice(['7', '1,234', '98', '0', '15']) for _ in range(args.count)]
+    abbreviated = [rng.choice(['1.2K', '15K', '3M', '980']) for _ in range(args.count)]
+
+    results = {
+        'date_strptime_per_s': rate(old_date, titles),
+        'date_title_per_s': rate(parse_date_title, titles),
+        'date_title_repeated_per_s': rate(parse_date_title, repeated),
+        'count_int_per_s': rate(old_count, counts),
+        'count_per_s': rate(parse_count, counts),
+        'count_abbreviated_per_s': rate(parse_count, abbreviated),
+        'abbreviated_misparsed_by_int': sum(old_count(c) != parse_count(c) for c in abbreviated)
+    }
+
+    if args.json:
+        print(json.dumps({'count': args.count, 'failures': failures, 'results': results}, indent=2))
+    else:
+        for name, value in results.items():
+            print(f"{name:<30}{value:>14,.0f}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Nitter mirror, serving the recorded pages in fixtures/.
+
+Every list URL lists the same synthetic accounts (bench_0000, bench_0001, ...);
+each account's profile is one of the recorded profiles with the username
+swapped in and tweet dates shifted so the newest tweet is a few minutes old.
+
+Faults can be injected to exercise retries and failover:
+
+    python benchmarks/nitter_server.py --accounts 500 --latency 0.05 --error-rate 0.02 --rate-429 0.05
+
+The first line printed is the base URL (the port is picked by the OS unless
+--port is given). GET /__stats returns request counts by status as JSON.
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+DATE_TITLE = re.compile(r'title="(\w{3} \d{1,2}, \d{4} · \d{1,2}:\d{2} [AP]M UTC)"')
+DATE_FORMAT = '%b %d, %Y · %I:%M %p UTC'
+
+
+def shift_dates(html):
+    """Move every tweet date forward so the newest one lands just before now"""
+    dates = [datetime.strptime(d, DATE_FORMAT) for d in DATE_TITLE.findall(html)]
+    if not dates:
+        return html
+    shift = datetime.now(timezone.utc).replace(tzinfo=None) - max(dates) - timedelta(minutes=5)
+
+    def repl(match):
+        shifted = datetime.strptime(match.group(1), DATE_FORMAT) + shift
+        return f'title="{shifted.strftime(DATE_FORMAT)}"'
+
+    return DATE_TITLE.sub(repl, html)
+
+
+class FixtureSite:
+    """Renders list and profile pages for the synthetic account set"""
+    def __init__(self, accounts, page_size=0):
+        self.accounts = [f"bench_{i:04d}" for i in range(accounts)]
+        self.page_size = page_size or accounts
+
+        self.profiles = []
+        for path in sorted(glob.glob(os.path.join(FIXTURES, 'profile_*.html'))):
+            user = os.path.basename(path)[len('profile_'):-len('.html')]
+            with open(path, encoding='utf-8') as f:
+                self.profiles.append((user, shift_dates(f.read())))
+
+        with open(os.path.join(FIXTURES, 'list_members.html'), encoding='utf-8') as f:
+            members = f.read()
+        start = members.index('<div class="timeline-item')
+        end = members.index('<div class="show-more"')
+        self.list_head = members[:start]
+        self.list_foot = members[members.index('</div>', end) + len('</div>'):]
+        first_item = members[start:members.index('<div class="timeline-item', start + 1)]
+        self.member_user = re.search(r'href="/([^"/]+)"', first_item).group(1)
+        self.member_item = first_item
+
+    def profile(self, username):
+        index = int(hashlib.md5(username.encode()).hexdigest(), 16) % len(self.profiles)
+        user, html = self.profiles[index]
+        return html.replace(user, username)
+
+    def list_page(self, cursor):
+        start = int(cursor or 0)
+        page = self.accounts[start:start + self.page_size]
+        body = ''.join(self.member_item.replace(self.member_user, u) for u in page)
+        if start + self.page_size < len(self.accounts):
+            body += f'<div class="show-more"><a href="?cursor={start + self.page_size}">Load more</a></div>\n'
+        return self.list_head + body + self.list_foot
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like a real mirror behind nginx
+    site = None
+    latency = 0.0
+    error_rate = 0.0
+    rate_429 = 0.0
+    stats = {}
+    stats_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, status):
+        with self.stats_lock:
+            self.stats[str(status)] = self.stats.get(str(status), 0) + 1
+
+    def _send(self, status, body=b'', headers=None):
+        self._count(status)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/')
+        query = parse_qs(url.query)
+
+        if path == '/__stats':
+            with self.stats_lock:
+                body = json.dumps(self.stats).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.latency:
+            time.sleep(self.latency * random.uniform(0.5, 1.5))
+
+        roll = random.random()
+        if roll < self.rate_429:
+            return self._send(429, b'Too Many Requests', {'Retry-After': '1'})
+        if roll < self.rate_429 + self.error_rate:
+            return self._send(503, b'Service Unavailable')
+
+        if path == '':
+            html = '<html><head><title>nitter</title></head><body>nitter</body></html>'
+        elif path.startswith('/i/lists/'):
+            html = self.site.list_page(query.get('cursor', [None])[0])
+        elif '/' not in path.strip('/'):
+            html = self.site.profile(path.strip('/'))
+        else:
+            return self._send(404, b'Not Found')
+
+        body = html.encode('utf-8')
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, headers={'ETag': etag})
+        headers = {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag}
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        self._send(200, body, headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded Nitter pages locally')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--accounts', type=int, default=100, help='Accounts listed on every list page')
+    parser.add_argument('--page-size', type=int, default=0, help='List members per page (0: all on one page)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean added latency per request in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    Handler.site = FixtureSite(args.accounts, args.page_size)
+    Handler.latency = args.latency
+    Handler.error_rate = args.error_rate
+    Handler.rate_429 = args.rate_429
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), Handler)
+    server.daemon_threads = True
+    print(f"http://127.0.0.1:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+
+from tweet import Tweet
+
+
+class RunCheckpoint:
+    """Accounts finished by an interrupted run, so a restart can skip them
+
+    Stored as JSON lines: a header with the run's start time, then one line
+    per completed account with its parsed tweets. Lines are appended and
+    flushed to disk every `every` accounts or `interval` seconds; a torn last
+    line from a crash is ignored on load. Checkpoints older than max_age are
+    discarded because their tweets would no longer be fresh; a resumed run
+    keeps the original start time, so resuming again doesn't extend that.
+    """
+    def __init__(self, checkpoint_file='run_checkpoint.jsonl', every=25, interval=10.0, max_age=6 * 3600):
+        self.checkpoint_file = checkpoint_file
+        self.every = every
+        self.interval = interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._file = None
+        self._unflushed = 0
+        self._flushed_at = time.monotonic()
+        # Start time of the run load() found, carried over by start()
+        self.started_at = None
+
+    def load(self):
+        """{username: [Tweet]} from a recent unfinished run, or {} if there is none"""
+        completed = {}
+        self.started_at = None
+        if not os.path.exists(self.checkpoint_file):
+            return completed
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                header = json.loads(f.readline())
+                if time.time() - header['started_at'] > self.max_age:
+                    print("Discarding stale checkpoint")
+                    return {}
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Torn write from a crash
+                    completed[entry['account']] = [Tweet.from_dict(t) for t in entry['tweets']]
+                self.started_at = header['started_at']
+        except Exception as e:
+            print(f"Error loading checkpoint: {e}")
+            return {}
+        return completed
+
+    def start(self, completed=None):
+        """Begin a checkpoint file, carrying over accounts resumed from the last one"""
+        completed = completed or {}
+        started_at = self.started_at if completed and self.started_at else time.time()
+        with self._lock:
+            tmp_file = f"{self.checkpoint_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                f.write(json.dumps({'started_at': started_at}) + '\n')
+                for username, tweets in completed.items():
+                    f.write(json.dumps({'account': username, 'tweets': [t.to_dict() for t in tweets]}) + '\n')
+            os.replace(tmp_file, self.checkpoint_file)
+            self._file = open(self.checkpoint_file, 'a')
+            self._flushed_at = time.monotonic()
+
+    def add(self, username, tweets):
+        """Record a completed account; written through to disk periodically"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps({'account': username, 'tweets': [t.to_dict() for t in tweets]}) + '\n')
+            self._unflushed += 1
+            if self._unflushed >= self.every or time.monotonic() - self._flushed_at >= self.interval:
+                self._flush()
+
+    def _flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unflushed = 0
+        self._flushed_at = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """The run finished; nothing to resume"""
+        self.close()
+        if os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
@@ -0,0 +1,369 @@
+"""Long-running mode: rolling refresh of accounts and a local feed server.
+
+Instead of one cold run a day, `generate_rss.py --daemon` keeps the generator
+(its probed mirrors, warm connection pool and per-account state) resident:
+
+- Each account has its own next refresh time. Accounts that posted recently
+  are polled more often: the interval is quiet_interval / (1 + tweets in the
+  last 6 hours), never below active_interval, with a little jitter so they
+  spread out. Due accounts are fetched together at most once per tick.
+- A poll re-reads the account's timeline down to the recent window rather than
+  stopping at the newest tweet already seen, so held tweets (and the store)
+  carry current likes, retweets and replies.
+- After every refresh the rankings are rebuilt from the tweets held for each
+  account and the feed files are rewritten, as in a normal run.
+- FeedServer serves those feeds from memory over HTTP, with ETag /
+  If-None-Match (304), Last-Modified and pre-compressed gzip, so a reader's
+  poll costs a dictionary lookup however large the feed is.
+- List members are re-fetched every members_interval and mirrors re-probed
+  every probe_interval.
+
+    python generate_rss.py --daemon --serve 127.0.0.1:8080 --formats rss,atom,json
+    curl -i http://127.0.0.1:8080/tech_ai_twitter.xml
+"""
+import argparse
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPES = [
+    ('.atom.xml', 'application/atom+xml; charset=utf-8'),
+    ('.json', 'application/feed+json; charset=utf-8'),
+    ('.xml', 'application/rss+xml; charset=utf-8')
+]
+
+
+def parse_address(value):
+    """'127.0.0.1:8080' or ':8080' -> (host, port), for argparse"""
+    host, _, port = value.rpartition(':')
+    try:
+        return host or '127.0.0.1', int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {value!r}")
+
+
+def content_type(path):
+    for suffix, kind in CONTENT_TYPES:
+        if path.endswith(suffix):
+            return kind
+    return 'application/octet-stream'
+
+
+class _Feed:
+    """One published feed: body, gzipped body and validators, computed once per publish"""
+    __slots__ = ('body', 'gzipped', 'etag', 'last_modified', 'modified_at', 'content_type')
+
+    def __init__(self, body, content_type, modified_at):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6)
+        self.etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        self.modified_at = int(modified_at)
+        self.last_modified = formatdate(self.modified_at, usegmt=True)
+        self.content_type = content_type
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'tech-twitter-digest'
+    feeds = None  # FeedServer
+
+    def log_message(self, format, *args):
+        pass  # A poll every few minutes per reader would drown the refresh log
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head=False):
+        path = self.path.split('?', 1)[0]
+        if path == '/healthz':
+            return self._send(200, json.dumps(self.feeds.status).encode(), 'application/json', head=head)
+        feed = self.feeds.get(path)
+        if feed is None:
+            return self._send(404, b'not found\n', 'text/plain', head=head)
+
+        headers = {
+            'ETag': feed.etag,
+            'Last-Modified': feed.last_modified,
+            'Cache-Control': f"max-age={self.feeds.max_age}",
+            'Vary': 'Accept-Encoding'
+        }
+        if self._not_modified(feed):
+            return self._send(304, b'', None, headers, head=True)
+
+        body = feed.body
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = feed.gzipped
+            headers['Content-Encoding'] = 'gzip'
+        self._send(200, body, feed.content_type, headers, head=head)
+
+    def _not_modified(self, feed):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            return '*' in tags or feed.etag in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return feed.modified_at <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send(self, status, body, kind, headers=None, head=False):
+        self.send_response(status)
+        if kind:
+            self.send_header('Content-Type', kind)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        self.feeds.count(status)
+
+
+class FeedServer:
+    """Serves published feeds from memory; publish() swaps in new versions atomically"""
+    def __init__(self, host='127.0.0.1', port=8080, max_age=300):
+        self.max_age = max_age
+        self.status = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+        self._feeds = {}
+        handler = type('FeedHandler', (_FeedHandler,), {'feeds': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def get(self, path):
+        return self._feeds.get(path)
+
+    def count(self, status):
+        with self._lock:
+            self._requests[status] = self._requests.get(status, 0) + 1
+
+    def request_counts(self):
+        with self._lock:
+            return {str(status): n for status, n in sorted(self._requests.items())}
+
+    def publish(self, files, default=None):
+        """Serve these feed files (read once into memory) at /<basename>; default is also served at /"""
+        feeds = dict(self._feeds)
+        now = time.time()
+        for path in files:
+            with open(path, 'rb') as f:
+                body = f.read()
+            route = '/' + os.path.basename(path)
+            current = feeds.get(route)
+            # Unchanged feeds keep their validators, so readers keep getting 304s
+            if current is None or current.body != body:
+                feeds[route] = _Feed(body, content_type(path), now)
+            if path == default:
+                feeds['/'] = feeds[route]
+        self._feeds = feeds
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='feed-server', daemon=True)
+        self._thread.start()
+        print(f"✓ Serving feeds at {self.address}/")
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FeedDaemon:
+    """Keeps a TwitterListRSSGenerator resident and refreshes accounts on a rolling schedule"""
+    def __init__(self, generator, list_urls, output_file='tech_ai_twitter.xml', server=None,
+                 active_interval=900, quiet_interval=7200, members_interval=86400,
+                 probe_interval=3600, tick=None, report_path=None):
+        self.generator = generator
+        self.list_urls = list_urls
+        self.output_file = output_file
+        self.server = server
+        self.active_interval = active_interval
+        self.quiet_interval = quiet_interval
+        self.members_interval = members_interval
+        self.probe_interval = probe_interval
+        self.tick = tick or min(60, active_interval / 4)
+        self.report_path = report_path
+        self.latest = {}  # username -> that account's current recent tweets
+        self.stop = threading.Event()
+        self._schedule = []  # heap of (due, username)
+        self._scheduled = set()
+        self._executor = ThreadPoolExecutor(max_workers=generator.concurrency)
+        self.refreshes = 0
+        self._fingerprint = None
+
+        # A page polled again must not be replayed from the response cache
+        if generator.cache:
+            generator.cache.ttl = min(generator.cache.ttl, active_interval // 2)
+        # Held tweets are ranked by engagement, so every poll re-reads the whole window
+        # for current likes/retweets/replies instead of stopping at the newest tweet seen
+        generator.refresh_seen = True
+
+    def interval_for(self, tweets, now):
+        """Seconds until an account's next refresh: shorter the more it posted in the last 6 hours"""
+        recent = sum(1 for t in tweets if now - t.timestamp < 6 * 3600)
+        interval = max(self.active_interval, self.quiet_interval / (1 + recent))
+        return interval * random.uniform(0.9, 1.1)
+
+    def schedule(self, username, due):
+        heapq.heappush(self._schedule, (due, username))
+        self._scheduled.add(username)
+
+    def set_accounts(self, accounts):
+        """Follow a new member list: new accounts are due now, dropped ones fall off the schedule"""
+        self.generator.accounts = accounts
+        wanted = set(accounts)
+        now = time.time()
+        for username in accounts:
+            if username not in self._scheduled:
+                self.schedule(username, now)
+        for username in list(self.latest):
+            if username not in wanted:
+                del self.latest[username]
+
+    def due(self, now):
+        wanted = set(self.generator.accounts)
+        usernames = []
+        while self._schedule and self._schedule[0][0] <= now:
+            _, username = heapq.heappop(self._schedule)
+            self._scheduled.discard(username)
+            if username in wanted:
+                usernames.append(username)
+        return usernames
+
+    def refresh(self, usernames):
+        """Fetch these accounts, reschedule them, then rebuild and publish the feeds"""
+        gen = self.generator
+        started = time.monotonic()
+        fresh = []
+        for username, (tweets, elapsed) in zip(usernames, self._executor.map(gen._timed_fetch, usernames)):
+            gen.account_timings[username] = elapsed
+            self.latest[username] = tweets
+            fresh.extend(tweets)
+            self.schedule(username, time.time() + self.interval_for(tweets, time.time()))
+
+        if gen.incremental:
+            gen.account_state.save()
+        if gen.store and fresh:
+            with gen.report.stage('store'):
+                gen.store.upsert(fresh)
+            gen.assign_stories()
+        gen.report.incr('accounts', len(usernames))
+        gen.report.add_time('fetch_tweets', time.monotonic() - started)
+        self.refreshes += 1
+        tweets = self.publish()
+
+        next_due = self._schedule[0][0] - time.time() if self._schedule else 0
+        print(f"[{time.strftime('%H:%M:%S')}] Refreshed {len(usernames)} accounts in "
+              f"{time.monotonic() - started:.1f}s; {len(tweets)} tweets in feed; next refresh in {max(0, next_due):.0f}s")
+
+    def publish(self):
+        """Re-rank the held tweets, rewrite the feed files and hand them to the server"""
+        gen = self.generator
+        gen.start_ranking()
+        with gen.report.stage('rank'):
+            for i, username in enumerate(gen.accounts):
+                for j, tweet in enumerate(self.latest.get(username, ())):
+                    if gen.is_recent(tweet):
+                        gen.rank(tweet, order=(i, j))
+        tweets = gen.finish_ranking()
+        gen.report.incr('tweets_in_feed', len(tweets))
+
+        # Feeds embed their build time, so only rewrite them when an entry changed;
+        # otherwise readers would never see a 304
+        rankings = [tweets] + [r.snapshot() for r in gen.list_rankings.values()]
+        fingerprint = hash(tuple((t.url, t.likes, t.retweets, t.replies) for ranked in rankings for t in ranked))
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            paths = gen.write_feeds(tweets, output_file=self.output_file)
+            if self.server:
+                self.server.publish(paths, default=self.output_file)
+        if self.server:
+            self.server.status = {
+                'updated_at': time.time(),
+                'accounts': len(gen.accounts),
+                'tweets_in_feed': len(tweets),
+                'refreshes': self.refreshes,
+                'requests': self.server.request_counts()
+            }
+        if self.report_path:
+            gen.report.write(self.report_path)
+        gen.report.reset()
+        return tweets
+
+    def refresh_members(self):
+        accounts = self.generator.fetch_all_list_members(self.list_urls)
+        if accounts:
+            self.generator.save_cached_members(accounts)
+            self.set_accounts(accounts)
+        else:
+            print("Failed to refresh list members; keeping the current ones")
+
+    def run(self):
+        """Refresh until SIGINT/SIGTERM, serving the feeds meanwhile"""
+        gen = self.generator
+        gen.get_working_instance()
+        if gen.incremental:
+            gen.account_state.load()
+            # Serve what earlier runs stored straight away, before the first refresh finishes
+            for username in gen.accounts:
+                self.latest[username] = [t for t in gen.account_state.recent_tweets(username) if gen.is_recent(t)]
+        self.set_accounts(gen.accounts)
+
+        self.publish()
+        if self.server:
+            self.server.start()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.stop.set())
+
+        now = time.time()
+        next_members = now + self.members_interval
+        next_probe = now + self.probe_interval
+        last_cycle = 0.0
+        print(f"Daemon: {len(gen.accounts)} accounts, polled every {self.active_interval / 60:.0f}-"
+              f"{self.quiet_interval / 60:.0f} min by activity")
+        try:
+            while not self.stop.is_set():
+                now = time.time()
+                if now >= next_members:
+                    self.refresh_members()
+                    next_members = now + self.members_interval
+                if now >= next_probe and not gen.offline:
+                    gen.probe_instances()
+                    next_probe = now + self.probe_interval
+
+                usernames = self.due(now)
+                if usernames:
+                    last_cycle = now
+                    self.refresh(usernames)
+
+                # Sleep until the next account is due, but batch refreshes at most once per tick
+                next_due = self._schedule[0][0] if self._schedule else now + self.tick
+                wake = max(next_due, last_cycle + self.tick)
+                self.stop.wait(max(0.0, min(wake, next_members, next_probe) - time.time()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print("\nDaemon stopping...")
+            self._executor.shutdown(wait=True)
+            if self.server:
+                self.server.close()
+            if gen.incremental:
+                gen.account_state.save()
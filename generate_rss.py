@@ -1,16 +1,40 @@
-import requests
-from bs4 import BeautifulSoup
-import feedgen.feed
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 import time
-import random
 import json
 import os
+import sys
+import argparse
+import threading
+from urllib.parse import quote
+
+# requests (transport.py, instance_pool.py), the HTML parsers, feedgen, http.server
+# (daemon.py), multiprocessing (parse_pool.py), concurrent.futures and hashlib
+# (response_cache.py) are imported where they are first used, so rendering a feed
+# from the store starts without loading any of them
+from instance_scoreboard import InstanceScoreboard
+from checkpoint import RunCheckpoint
+from dedup import NearDuplicates
+from account_state import AccountStateStore
+from nitter_parser import BACKENDS
+from ranking import SCORE_NAMES, make_ranking
+from tweet_store import PERIODS, TweetStore, list_id_from_url
+from sharding import load_partials, parse_shard, partial_path, shard_of, write_partial
+from instrumentation import RunReport, profiled
+from rss_writer import FEED_LINK, FEED_SUBTITLE, SUFFIXES, WRITERS, entry_html, entry_title, render_entries, write_rss
+
+# How old a tweet may be and still count as recent (the old `(now - created_at).days <= 1`)
+RECENT_WINDOW = 2 * 86400
+
 
 class TwitterListRSSGenerator:
-    def __init__(self):
+    def __init__(self, concurrency=1, incremental=True, parser='lxml', instances=None, host_rate=1.0,
+                 top_k=100, score='engagement', max_per_author=None, store_path='tweets.db', report=None,
+                 pool_size=None, http2=False, cache_dir='.http_cache', cache_ttl=3600, offline=False,
+                 checkpoint_path='run_checkpoint.jsonl', shard=None, max_pages=5, rss_writer='stream',
+                 formats=('rss',), per_list_feeds=False, dedup=True, dedup_threshold=0.5,
+                 list_quota=None, parse_workers=None):
         # Public Nitter instances (rotate if one fails)
-        self.nitter_instances = [
+        self.nitter_instances = instances or [
             'https://nitter.poast.org',
             'https://nitter.net',
             'https://nitter.privacydev.net',
@@ -18,59 +42,196 @@ class TwitterListRSSGenerator:
             'https://nitter.mint.lgbt'
         ]
         
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        # Keep-alive connection pools sized so every parallel fetch can hold a
+        # connection to the same mirror (see transport.py); the session, mirror
+        # pool and parser backend are built on first use (see _lazy)
+        self.pool_size = pool_size or max(10, concurrency)
+        self.http2 = http2
+        self._lazy_lock = threading.Lock()
         
         # Cache file for list members
         self.cache_file = 'list_members_cache.json'
         self.accounts = []
+        self.list_members = {}  # list id -> members, for per-list feeds
+        
+        # Ranking: keep the top_k tweets by the named scorer (see ranking.py)
+        self.top_k = top_k
+        self.score = score
+        self.max_per_author = max_per_author
+        self.list_quota = list_quota  # at most this many tweets per list in the combined feed
+        self.ranking = None
+        
+        # Near-duplicates and thread fragments are ranked as one story (see dedup.py)
+        self.dedup = dedup
+        self.dedup_threshold = dedup_threshold
+        self.clusters = None
+        
+        # (index, count) when this run only handles one shard of the accounts (see sharding.py);
+        # a shard keeps every tweet it collects for the merge step, not just its top K
+        self.shard = shard
+        self.shard_tweets = []
+        self.shard_positions = []
+        
+        # Feed writer: 'stream' (rss_writer.py) or the original 'feedgen'
+        self.rss_writer = rss_writer
+        
+        # Outputs of one scrape: the combined feed, optionally one per list, in each format
+        self.formats = list(formats)
+        self.per_list_feeds = per_list_feeds
+        self.list_rankings = {}
+        
+        # Tweet history across runs, for weekly and per-list digests (see tweet_store.py)
+        self.store = TweetStore(store_path) if store_path else None
+        
+        # HTML parser backend (see nitter_parser.py)
+        self.parser_name = parser
+        
+        # Per-account state (newest tweet seen, ETag/Last-Modified) for incremental runs.
+        # refresh_seen re-reads tweets already seen, down to the window, so they are ranked
+        # on current stats (an unchanged timeline still costs only a 304); without it the
+        # scan stops at the newest tweet seen and reuses the stored copies
+        self.incremental = incremental
+        self.refresh_seen = True
+        self.account_state = AccountStateStore('account_state.json')
+        
+        # Completed accounts of the current run, so a crashed run can resume (see checkpoint.py)
+        self.checkpoint = RunCheckpoint(checkpoint_path) if checkpoint_path else None
+        
+        # Parallel account fetches, spread over every healthy instance with a
+        # per-host token bucket keeping each mirror at a polite request rate
+        self.concurrency = max(1, concurrency)
+        self.report = report or RunReport()
+        
+        # Page parsing off the fetch threads, in worker processes (see parse_pool.py);
+        # 'auto' sizes the pool to the CPU count
+        self.parse_pool = None
+        if parse_workers:
+            workers = None if parse_workers == 'auto' else int(parse_workers)
+            from parse_pool import ParsePool
+            self.parse_pool = ParsePool(parser, workers, report=self.report)
+        # Probe history from earlier runs decides which mirrors are tried first
+        self.scoreboard = InstanceScoreboard('instance_scoreboard.json')
+        self.scoreboard.load()
+        # Pages fetched within cache_ttl are replayed from disk (see response_cache.py)
+        self.offline = offline
+        self.cache = None
+        if cache_dir:
+            from response_cache import ResponseCache
+            self.cache = ResponseCache(cache_dir, ttl=cache_ttl)
+        if offline and not self.cache:
+            raise ValueError("--offline needs the response cache (drop --no-cache)")
+        self.host_rate = host_rate
+        self.account_timings = {}
+        self.fetch_seconds = 0.0
+        
+        # Timeline pages read per account at most while tweets are still recent
+        self.max_pages = max_pages
+    
+    def _lazy(self, name, build):
+        """Build an attribute on first use, once even when fetch threads race for it"""
+        value = self.__dict__.get(name)
+        if value is None:
+            with self._lazy_lock:
+                value = self.__dict__.get(name)
+                if value is None:
+                    value = self.__dict__[name] = build()
+        return value
+    
+    @property
+    def session(self):
+        """Keep-alive HTTP session (imports requests)"""
+        def build():
+            from transport import make_session
+            return make_session(pool_size=self.pool_size, hosts=len(self.nitter_instances), http2=self.http2)
+        return self._lazy('_session', build)
+    
+    @property
+    def pool(self):
+        """Rate-limited pool of Nitter mirrors"""
+        def build():
+            from instance_pool import InstancePool
+            return InstancePool(self.nitter_instances, rate=self.host_rate, report=self.report,
+                                scoreboard=self.scoreboard, cache=self.cache, offline=self.offline)
+        return self._lazy('_pool', build)
+    
+    @property
+    def parser(self):
+        """HTML parser backend (imports lxml, bs4 or selectolax)"""
+        def build():
+            from nitter_parser import get_backend
+            return get_backend(self.parser_name)
+        return self._lazy('_parser', build)
+    
+    def probe_instances(self):
+        """Probe every mirror; returns the healthy ones
+        
+        Uses its own session without connect retries: with the fetch session's
+        retries, each blackholed mirror would cost three connect timeouts.
+        """
+        from transport import make_session
+        session = make_session(pool_size=1, hosts=len(self.nitter_instances), retries=0)
+        try:
+            with self.report.stage('probe'):
+                return self.pool.probe(session)
+        finally:
+            session.close()
     
     def get_working_instance(self):
         """Find a working Nitter instance"""
-        for instance in self.nitter_instances:
-            try:
-                response = self.session.get(instance, timeout=10)
-                if response.status_code == 200:
-                    print(f"Using Nitter instance: {instance}")
-                    return instance
-            except:
-                continue
-        return self.nitter_instances[0]  # Fallback
+        if self.offline:
+            print("Offline: serving pages from the response cache only")
+            return self.pool.best()
+        if not self.pool.probed:
+            print("Probing Nitter instances...")
+            self.probe_instances()
+        instance = self.pool.best()
+        print(f"Using Nitter instance: {instance}")
+        return instance
     
-    def fetch_list_members(self, list_url, instance_url):
-        """Fetch members from a Twitter list via Nitter"""
+    def fetch_list_members(self, list_url, max_pages=500):
+        """Fetch members from a Twitter list via Nitter, following "Load more" cursors"""
+        members = []
+        seen = set()
+        
         try:
             # Convert Twitter list URL to Nitter format
-            # https://x.com/i/lists/1539497752140206080 -> https://nitter.net/i/lists/1539497752140206080
-            list_id = list_url.split('/lists/')[-1].strip()
-            nitter_url = f"{instance_url}/i/lists/{list_id}"
+            # https://x.com/i/lists/1539497752140206080 -> /i/lists/1539497752140206080/members on any instance
+            list_id = list_id_from_url(list_url)
+            nitter_path = f"/i/lists/{list_id}/members"
             
-            print(f"Fetching list members from: {nitter_url}")
-            response = self.session.get(nitter_url, timeout=15)
-            
-            if response.status_code != 200:
-                print(f"Failed to fetch list (status {response.status_code})")
-                return []
+            print(f"Fetching list members from: {nitter_path}")
+            cursor = None
+            cursors_seen = set()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            members = []
-            
-            # Find all user links in the list
-            user_links = soup.find_all('a', class_='username')
-            
-            for link in user_links:
-                username = link.get_text(strip=True).replace('@', '')
-                if username and username not in members:
-                    members.append(username)
+            for page in range(max_pages):
+                path = f"{nitter_path}?cursor={quote(cursor)}" if cursor else nitter_path
+                response = self.pool.get(self.session, path, timeout=15)
+                
+                if response.status_code != 200:
+                    print(f"Failed to fetch list page {page + 1} (status {response.status_code})")
+                    break
+                
+                usernames, cursor = self.parser.members_page(response.content)
+                
+                # Order-preserving de-duplication
+                new = 0
+                for username in usernames:
+                    if username and username not in seen:
+                        seen.add(username)
+                        members.append(username)
+                        new += 1
+                
+                # Stop at the last page, or if Nitter hands back a page we've already seen
+                if not cursor or cursor in cursors_seen or not new:
+                    break
+                cursors_seen.add(cursor)
             
             print(f"Found {len(members)} members in list")
             return members
             
         except Exception as e:
             print(f"Error fetching list members: {e}")
-            return []
+            return members
     
     def load_cached_members(self):
         """Load cached list members if available"""
@@ -78,6 +239,7 @@ class TwitterListRSSGenerator:
             try:
                 with open(self.cache_file, 'r') as f:
                     data = json.load(f)
+                    self.list_members = data.get('lists', {})
                     print(f"Loaded {len(data['accounts'])} accounts from cache")
                     return data['accounts']
             except:
@@ -90,121 +252,113 @@ class TwitterListRSSGenerator:
             with open(self.cache_file, 'w') as f:
                 json.dump({
                     'accounts': accounts,
+                    'lists': self.list_members,
                     'updated_at': datetime.now(timezone.utc).isoformat()
                 }, f, indent=2)
             print(f"Cached {len(accounts)} accounts")
         except Exception as e:
             print(f"Error saving cache: {e}")
     
+    def store_list_members(self):
+        """Write the list -> members map (fetched or loaded from the cache) to the tweet store"""
+        if self.store:
+            for list_id, members in self.list_members.items():
+                self.store.set_list_members(list_id, members)
+    
     def fetch_all_list_members(self, list_urls):
         """Fetch members from all provided lists"""
-        instance = self.get_working_instance()
-        all_members = set()
+        from concurrent.futures import ThreadPoolExecutor
+        self.get_working_instance()
+        
+        # Lists are paged through concurrently; the instance pool keeps each mirror polite
+        with self.report.stage('list_fetch'):
+            with ThreadPoolExecutor(max_workers=max(1, min(len(list_urls), self.concurrency))) as executor:
+                results = list(executor.map(self.fetch_list_members, list_urls))
         
-        for list_url in list_urls:
-            print(f"\nProcessing list: {list_url}")
-            members = self.fetch_list_members(list_url, instance)
-            all_members.update(members)
-            time.sleep(random.uniform(2, 4))  # Be polite
+        # Keep first-seen order across lists
+        all_members = {}
+        for list_url, members in zip(list_urls, results):
+            print(f"List {list_url}: {len(members)} members")
+            all_members.update(dict.fromkeys(members))
+            if members:
+                self.list_members[list_id_from_url(list_url)] = members
+            if self.store and members:
+                self.store.set_list_members(list_id_from_url(list_url), members)
         
         return list(all_members)
     
-    def fetch_tweets_from_account(self, username, instance_url, max_tweets=3):
-        """Fetch recent tweets from a user via Nitter"""
+    def select_shard(self):
+        """Keep only the accounts that belong to this run's shard"""
+        index, shards = self.shard
+        total = len(self.accounts)
+        selected = [(i, u) for i, u in enumerate(self.accounts) if shard_of(u, shards) == index]
+        self.shard_positions = [i for i, _ in selected]
+        self.accounts = [u for _, u in selected]
+        print(f"Shard {index}/{shards}: {len(self.accounts)} of {total} accounts")
+        return self.accounts
+    
+    def is_recent(self, tweet):
+        """Only include tweets from last 24 hours"""
+        return self.is_recent_time(tweet.timestamp)
+    
+    def is_recent_time(self, timestamp):
+        # Same cut-off as the old `(now - created_at).days <= 1`
+        return time.time() - timestamp < RECENT_WINDOW
+    
+    def fetch_tweets_from_account(self, username, max_pages=5, max_tweets=100):
+        """Fetch recent tweets from a user via Nitter
+        
+        Reads the timeline newest-first and stops at the first tweet outside the
+        recent window (or already seen), following "Load more" pages until then.
+        """
         try:
-            url = f"{instance_url}/{username}"
-            response = self.session.get(url, timeout=15)
+            headers_for = None
+            last_seen_id = None
+            if self.incremental:
+                headers_for = lambda instance: self.account_state.conditional_headers(username, instance)
+                if not self.refresh_seen:
+                    last_seen_id = self.account_state.newest_id(username)
+            
+            response = self.pool.get(self.session, f"/{username}", timeout=15, headers_for=headers_for)
+            
+            # Nothing new since the last run; reuse what we stored then
+            if response.status_code == 304:
+                self.report.incr('not_modified')
+                return [t for t in self.account_state.recent_tweets(username) if self.is_recent(t)]
             
             if response.status_code != 200:
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Validators for the next run come from the first page
+            first_response = response
             tweets = []
+            seen_urls = set()
+            newest_id = None
             
-            # Find all tweet containers
-            tweet_items = soup.find_all('div', class_='timeline-item')[:max_tweets]
+            for page in range(max_pages):
+                parsed = self.parse_page(response.content, username, last_seen_id,
+                                         max_tweets - len(tweets), seen_urls)
+                self.report.add_time('parse', parsed.parse_seconds)
+                if parsed.dates_unparsed:
+                    self.report.incr('dates_unparsed', parsed.dates_unparsed)
+                tweets.extend(parsed.tweets)
+                seen_urls.update(t.url for t in parsed.tweets)
+                if parsed.newest_id:
+                    newest_id = max(newest_id or 0, parsed.newest_id)
+                
+                # Whole page still inside the window: the next one may be too
+                if parsed.done or not parsed.cursor or page + 1 >= max_pages:
+                    break
+                response = self.pool.get(self.session, f"/{username}?cursor={quote(parsed.cursor)}", timeout=15)
+                if response.status_code != 200:
+                    break
+                self.report.incr('timeline_pages_followed')
             
-            for item in tweet_items:
-                try:
-                    # Skip retweets
-                    if item.find('div', class_='retweet-header'):
-                        continue
-                    
-                    # Extract tweet content
-                    content_div = item.find('div', class_='tweet-content')
-                    if not content_div:
-                        continue
-                    
-                    text = content_div.get_text(strip=True)
-                    
-                    # Skip if too short (likely just a link)
-                    if len(text) < 20:
-                        continue
-                    
-                    # Extract tweet link
-                    link_elem = item.find('a', class_='tweet-link')
-                    if link_elem:
-                        tweet_path = link_elem.get('href', '')
-                        tweet_url = f"https://twitter.com{tweet_path}"
-                    else:
-                        continue
-                    
-                    # Extract stats
-                    stats = item.find('div', class_='tweet-stats')
-                    likes = 0
-                    retweets = 0
-                    replies = 0
-                    
-                    if stats:
-                        stat_spans = stats.find_all('span', class_='tweet-stat')
-                        for span in stat_spans:
-                            icon = span.find('span', class_='icon')
-                            num_span = span.find('span', class_='icon-text')
-                            
-                            if icon and num_span:
-                                icon_class = icon.get('class', [])
-                                try:
-                                    num = int(num_span.get_text(strip=True).replace(',', ''))
-                                except:
-                                    num = 0
-                                
-                                if 'icon-retweet' in icon_class:
-                                    retweets = num
-                                elif 'icon-heart' in icon_class:
-                                    likes = num
-                                elif 'icon-comment' in icon_class:
-                                    replies = num
-                    
-                    # Extract timestamp
-                    date_elem = item.find('span', class_='tweet-date')
-                    created_at = datetime.now(timezone.utc)
-                    
-                    if date_elem:
-                        date_link = date_elem.find('a')
-                        if date_link and date_link.get('title'):
-                            try:
-                                date_str = date_link['title']
-                                created_at = datetime.strptime(date_str, '%b %d, %Y · %I:%M %p UTC')
-                            except:
-                                pass
-                    
-                    # Only include tweets from last 24 hours
-                    if (datetime.now(timezone.utc) - created_at).days > 1:
-                        continue
-                    
-                    tweets.append({
-                        'author': username,
-                        'text': text,
-                        'url': tweet_url,
-                        'likes': likes,
-                        'retweets': retweets,
-                        'replies': replies,
-                        'created_at': created_at,
-                        'engagement': likes + (retweets * 2) + replies  # Weight retweets more
-                    })
-                    
-                except Exception as e:
-                    continue
+            if self.incremental:
+                tweets = self.account_state.update(
+                    username, first_response.instance, first_response.headers, newest_id, tweets,
+                    keep=self.is_recent
+                )
             
             return tweets
             
@@ -212,86 +366,522 @@ class TwitterListRSSGenerator:
             print(f"Error fetching from @{username}: {e}")
             return []
     
+    def parse_page(self, html, username, last_seen_id, max_tweets, seen_urls):
+        """One timeline page -> TimelinePage, in the parse worker pool if there is one"""
+        cutoff = time.time() - RECENT_WINDOW
+        if self.parse_pool:
+            return self.parse_pool.parse(html, username, last_seen_id, cutoff, max_tweets, seen_urls)
+        from parse_pool import parse_timeline
+        return parse_timeline(self.parser, html, username, last_seen_id, cutoff, max_tweets, seen_urls)
+    
+    def _timed_fetch(self, username):
+        """Fetch one account and report how long it took"""
+        started = time.monotonic()
+        tweets = self.fetch_tweets_from_account(username, max_pages=self.max_pages)
+        return tweets, time.monotonic() - started
+    
     def fetch_all_tweets(self):
         """Fetch tweets from all monitored accounts"""
+        from concurrent.futures import ThreadPoolExecutor, as_completed
         if not self.accounts:
             print("No accounts to fetch from!")
             return []
         
-        instance = self.get_working_instance()
-        all_tweets = []
+        self.get_working_instance()
+        if self.incremental:
+            self.account_state.load()
+        total = len(self.accounts)
         
-        print(f"\nFetching tweets from {len(self.accounts)} accounts...")
+        # Tweets are ranked as they arrive; only the current top K are kept
+        self.start_ranking()
         
-        for i, username in enumerate(self.accounts):
-            print(f"[{i+1}/{len(self.accounts)}] @{username}...", end=' ')
-            
-            tweets = self.fetch_tweets_from_account(username, instance, max_tweets=3)
-            
-            if tweets:
-                all_tweets.extend(tweets)
-                print(f"✓ {len(tweets)} tweets")
-            else:
-                print("✗")
+        # Accounts an interrupted run already finished are taken from its checkpoint
+        resumed = {}
+        if self.checkpoint:
+            wanted = set(self.accounts)
+            # Only what is still inside the window: a resumed run may be hours old
+            resumed = {u: [t for t in tweets if self.is_recent(t)]
+                       for u, tweets in self.checkpoint.load().items() if u in wanted}
+            if resumed:
+                print(f"Resuming from checkpoint: {len(resumed)}/{total} accounts already fetched")
+                self.report.incr('accounts_resumed', len(resumed))
+            self.checkpoint.start(resumed)
+        
+        print(f"\nFetching tweets from {total - len(resumed)} accounts (concurrency {self.concurrency})...")
+        started = time.monotonic()
+        pending = []
+        
+        def collect(i, tweets):
+            # Order by account then position so ties resolve the same way as a sequential run
+            with self.report.stage('rank'):
+                for j, tweet in enumerate(tweets):
+                    self.rank(tweet, order=(i, j))
+            if self.shard:
+                self.shard_tweets.extend(tweets)
             
-            # Be polite - add delay
-            if i < len(self.accounts) - 1:
-                time.sleep(random.uniform(1, 2))
+            # Batch store writes so each transaction covers many accounts
+            if self.store:
+                pending.extend(tweets)
+                if len(pending) >= 500:
+                    with self.report.stage('store'):
+                        self.store.upsert(pending)
+                    pending.clear()
         
-        # Sort by engagement
-        all_tweets.sort(key=lambda x: x['engagement'], reverse=True)
+        for i, username in enumerate(self.accounts):
+            if username in resumed:
+                collect(i, resumed[username])
         
-        print(f"\nTotal tweets collected: {len(all_tweets)}")
-        return all_tweets[:100]  # Top 100 most engaging tweets
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self._timed_fetch, username): i
+                for i, username in enumerate(self.accounts)
+                if username not in resumed
+            }
+            for done, future in enumerate(as_completed(futures), len(resumed) + 1):
+                i = futures[future]
+                username = self.accounts[i]
+                tweets, elapsed = future.result()
+                self.account_timings[username] = elapsed
+                collect(i, tweets)
+                if self.checkpoint:
+                    self.checkpoint.add(username, tweets)
+                
+                if tweets:
+                    print(f"[{done}/{total}] @{username}... ✓ {len(tweets)} tweets ({elapsed:.2f}s)")
+                else:
+                    print(f"[{done}/{total}] @{username}... ✗ ({elapsed:.2f}s)")
+        
+        if self.checkpoint:
+            self.checkpoint.close()
+        
+        wall = self.fetch_seconds = time.monotonic() - started
+        self.report.add_time('fetch_tweets', wall)
+        self.report.incr('accounts', total)
+        self.report.section('instances', self.pool.snapshot())
+        self.report.section('scoreboard', self.scoreboard.snapshot())
+        self.report.section('transport', self.session.stats())
+        fetched = total - len(resumed)
+        print(f"\nFetched {fetched} accounts in {wall:.1f}s ({fetched / wall if wall else 0:.2f} accounts/s)")
+        slowest = sorted(self.account_timings.items(), key=lambda x: x[1], reverse=True)[:5]
+        if slowest:
+            print("Slowest accounts: " + ", ".join(f"@{u} {t:.2f}s" for u, t in slowest))
+        self.pool.summary()
+        if self.incremental:
+            self.account_state.save()
+        if self.store:
+            with self.report.stage('store'):
+                self.store.upsert(pending)
+            self.assign_stories()
+            print(f"Tweet store: {self.store.count()} tweets in {self.store.path}")
+        
+        collected = len(self._unclustered) if self.clusters is not None else self.ranking.seen
+        print(f"\nTotal tweets collected: {collected}")
+        self.report.incr('tweets_collected', collected)
+        return self.finish_ranking()  # Top K most engaging tweets
+    
+    def assign_stories(self):
+        """File newly stored tweets under their near-duplicate stories, which digests group by"""
+        if self.store and self.dedup:
+            with self.report.stage('stories'):
+                assigned = self.store.assign_stories(self.dedup_threshold)
+            self.report.incr('tweets_assigned_stories', assigned)
+    
+    def home_lists(self):
+        """author -> list id for --list-quota; a member of several lists counts towards the first"""
+        home = {}
+        for list_id, members in self.list_members.items():
+            for author in members:
+                home.setdefault(author, list_id)
+        return home
+    
+    def start_ranking(self):
+        """Fresh top-K rankings: one over everything, plus one per list for per-list feeds"""
+        self.ranking = make_ranking(self.top_k, self.score, self.max_per_author, self.home_lists(), self.list_quota)
+        self.clusters = NearDuplicates(self.dedup_threshold) if self.dedup else None
+        self._unclustered = []
+        self.list_rankings = {}
+        self._author_lists = {}
+        if self.per_list_feeds:
+            for list_id, members in self.list_members.items():
+                self.list_rankings[list_id] = make_ranking(self.top_k, self.score, self.max_per_author)
+                for author in members:
+                    self._author_lists.setdefault(author, []).append(list_id)
     
-    def generate_rss(self, tweets, output_file='tech_ai_twitter.xml'):
+    def rank(self, tweet, order):
+        if self.clusters is not None:
+            # Clustered in order by finish_ranking(), so the stories don't depend on
+            # which fetch (or shard file) came in first; this holds every tweet of the
+            # run until then, not just the top K
+            self._unclustered.append((order, tweet))
+        else:
+            self._rank(tweet, order)
+    
+    def _rank(self, tweet, order):
+        self.ranking.add(tweet, order=order)
+        for list_id in self._author_lists.get(tweet.author, ()):
+            self.list_rankings[list_id].add(tweet, order=order)
+    
+    def finish_ranking(self):
+        """Rank the collapsed stories (when deduplicating) and return the top K"""
+        if self.clusters is not None:
+            self.report.incr('tweets_buffered', len(self._unclustered))
+            with self.report.stage('dedup'):
+                self._unclustered.sort(key=lambda item: item[0])
+                for order, tweet in self._unclustered:
+                    self.clusters.add(tweet, order)
+                self._unclustered = []
+                for tweet, order, _ in self.clusters.results():
+                    self._rank(tweet, order)
+            print(f"Near-duplicates: {self.clusters.seen} tweets -> {len(self.clusters)} stories "
+                  f"({self.clusters.collapsed} collapsed)")
+            self.report.incr('tweets_collapsed', self.clusters.collapsed)
+        with self.report.stage('rank'):
+            return self.ranking.snapshot()
+    
+    def merge_shards(self, paths):
+        """Rank the tweets of all shard files together, as if one run had fetched them"""
+        tweets, self.accounts, account_state = load_partials(paths)
+        
+        # Same tie-breaking as fetch_all_tweets: account order, then position
+        position = {username: i for i, username in enumerate(self.accounts)}
+        if (self.per_list_feeds or self.list_quota or self.store) and not self.list_members:
+            self.load_cached_members()
+        self.start_ranking()
+        with self.report.stage('rank'):
+            for j, tweet in enumerate(tweets):
+                self.rank(tweet, order=(position.get(tweet.author, len(position)), j))
+        
+        if account_state:
+            self.account_state.load()
+            self.account_state.merge(account_state)
+            self.account_state.save()
+        if self.store:
+            with self.report.stage('store'):
+                self.store.upsert(tweets)
+                # Shards run with --no-store, so per-list digests need membership from here
+                self.store_list_members()
+            self.assign_stories()
+            print(f"Tweet store: {self.store.count()} tweets in {self.store.path}")
+        
+        self.report.incr('accounts', len(self.accounts))
+        self.report.incr('tweets_collected', len(tweets))
+        return self.finish_ranking()
+    
+    def digest(self, period='daily', list_id=None):
+        """Top tweets of the last day/week from the store, without touching the network"""
+        since = self.store.since(period)
+        # Stories are normally assigned when tweets are stored; this catches stores
+        # written by older versions or with --no-dedup
+        self.assign_stories()
+        if self.score == 'engagement' and not self.max_per_author and not self.list_quota:
+            top = self.store.top_stories if self.dedup else self.store.top
+            return top(since, list_id, self.top_k)
+        tweets = (self.store.iter_stories if self.dedup else self.store.iter_tweets)(since, list_id)
+        if self.list_quota and not self.list_members:
+            self.load_cached_members()
+        ranking = make_ranking(self.top_k, self.score, self.max_per_author, self.home_lists(), self.list_quota)
+        ranking.extend(tweets)
+        return ranking.snapshot()
+    
+    def close(self):
+        if '_session' in self.__dict__:
+            self._session.close()
+        if self.parse_pool:
+            self.parse_pool.close()
+        if self.store:
+            self.store.close()
+    
+    def generate_rss(self, tweets, output_file='tech_ai_twitter.xml', title='Tech & AI Twitter Daily Digest'):
         """Generate RSS feed from tweets"""
+        with self.report.stage('rss_write'):
+            if self.rss_writer == 'feedgen':
+                count = self._write_rss(tweets, output_file, title)
+            else:
+                count = write_rss(render_entries(tweets), output_file, title)
+        print(f"\n✓ RSS feed generated: {output_file}")
+        print(f"  Contains {count} tweets")
+        return output_file
+    
+    def write_feeds(self, tweets, output_file='tech_ai_twitter.xml', title='Tech & AI Twitter Daily Digest'):
+        """Write every configured feed from one scrape, in parallel
+        
+        The combined feed plus (with per_list_feeds) one per list, each in every
+        format in self.formats. Entry HTML is rendered once per tweet and shared.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        stem = output_file[:-len('.xml')] if output_file.endswith('.xml') else output_file
+        feeds = [(stem, title, tweets)]
+        for list_id, ranking in self.list_rankings.items():
+            feeds.append((f"{stem}_list_{list_id}", f"{title} (list {list_id})", ranking.snapshot()))
+        
+        with self.report.stage('render'):
+            cache = {}
+            rendered = [(name, feed_title, list(render_entries(feed_tweets, cache)))
+                        for name, feed_title, feed_tweets in feeds]
+        
+        def write(job):
+            name, feed_title, entries, fmt = job
+            path = output_file if (name == stem and fmt == 'rss') else f"{name}{SUFFIXES[fmt]}"
+            if fmt == 'rss' and self.rss_writer == 'feedgen':
+                count = self._write_rss([e.tweet for e in entries], path, feed_title)
+            else:
+                count = WRITERS[fmt](entries, path, feed_title)
+            return path, count
+        
+        jobs = [(name, feed_title, entries, fmt) for name, feed_title, entries in rendered for fmt in self.formats]
+        with self.report.stage('rss_write'):
+            with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), os.cpu_count() or 1))) as executor:
+                written = list(executor.map(write, jobs))
+        
+        for path, count in written:
+            print(f"✓ Feed written: {path} ({count} tweets)")
+        self.report.incr('feeds_written', len(written))
+        return [path for path, _ in written]
+    
+    def _write_rss(self, tweets, output_file, title):
+        import feedgen.feed
         fg = feedgen.feed.FeedGenerator()
-        fg.id('https://yourdomain.com/tech-ai-twitter')
-        fg.title('Tech & AI Twitter Daily Digest')
+        fg.id(FEED_LINK)
+        fg.title(title)
         fg.author({'name': 'Twitter List Aggregator'})
-        fg.link(href='https://yourdomain.com/tech-ai-twitter', rel='alternate')
-        fg.subtitle('Daily highlights from curated Twitter lists')
+        fg.link(href=FEED_LINK, rel='alternate')
+        fg.subtitle(FEED_SUBTITLE)
         fg.language('en')
         fg.updated(datetime.now(timezone.utc))
         
         for tweet in tweets:
             fe = fg.add_entry()
-            fe.id(tweet['url'])
-            
-            # Create title with preview
-            title_text = tweet['text'][:120]
-            if len(tweet['text']) > 120:
-                title_text += '...'
-            fe.title(f"@{tweet['author']}: {title_text}")
-            
-            fe.link(href=tweet['url'])
-            
-            # Create description with full text and stats
-            description = f"""
-            <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;">
-                <p style="font-size: 15px; line-height: 1.5; margin: 0 0 12px 0;">{tweet['text']}</p>
-                <p style="color: #536471; font-size: 14px; margin: 0;">
-                    <strong>@{tweet['author']}</strong> · 
-                    👍 {tweet['likes']:,} · 
-                    🔄 {tweet['retweets']:,} · 
-                    💬 {tweet['replies']:,}
-                </p>
-                <p style="margin-top: 12px;">
-                    <a href="{tweet['url']}" style="color: #1d9bf0; text-decoration: none;">View on Twitter →</a>
-                </p>
-            </div>
-            """
-            fe.description(description)
-            fe.published(tweet['created_at'])
-        
-        # Generate RSS file
-        fg.rss_file(output_file)
-        print(f"\n✓ RSS feed generated: {output_file}")
-        print(f"  Contains {len(tweets)} tweets")
-        return output_file
+            fe.id(tweet.url)
+            fe.title(entry_title(tweet))
+            fe.link(href=tweet.url)
+            fe.description(entry_html(tweet))
+            fe.published(tweet.created_at)
+        
+        # feedgen builds the whole feed in memory; write it atomically all the same
+        tmp_file = f"{output_file}.tmp"
+        fg.rss_file(tmp_file)
+        os.replace(tmp_file, output_file)
+        return len(tweets)
 
-def main():
+# Subcommands; without one, the arguments are those of `fetch` (the original CLI)
+COMMANDS = {
+    'fetch': 'Scrape the lists and write the feeds (default)',
+    'render': 'Write a feed from the tweet store or from shard files, without the network',
+    'probe': 'Probe the Nitter instances and print the scoreboard',
+    'bench': 'Run a benchmark from benchmarks/ (e.g. `bench startup`)'
+}
+
+def _add_ranking_args(parser):
+    parser.add_argument('--top-k', type=int, default=100,
+                        help='Number of tweets to keep in the feed (default: 100)')
+    parser.add_argument('--score', choices=SCORE_NAMES, default='engagement',
+                        help='Ranking score: raw engagement, time-decayed engagement, or (with NumPy) '
+                             'per-author z-score / author-relative engagement (default: engagement)')
+    parser.add_argument('--list-quota', type=int, default=None,
+                        help='Keep at most this many tweets from each list in the feed (needs NumPy)')
+    parser.add_argument('--max-per-author', type=int, default=None,
+                        help='Keep at most this many tweets per author in the feed')
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='Rank near-duplicate tweets and thread parts separately instead of as one story')
+    parser.add_argument('--dedup-threshold', type=float, default=0.5,
+                        help='Word-bigram Jaccard similarity at which tweets count as the same story (default: 0.5)')
+
+def _add_output_args(parser):
+    parser.add_argument('--output', default='tech_ai_twitter.xml',
+                        help='RSS file to write (default: tech_ai_twitter.xml)')
+    parser.add_argument('--store', default='tweets.db',
+                        help='SQLite tweet store that accumulates tweets across runs (default: tweets.db)')
+    parser.add_argument('--no-store', action='store_true',
+                        help='Do not record tweets in the store')
+    parser.add_argument('--merge', nargs='+', metavar='PARTIAL',
+                        help='Build the feed from the partial files of a sharded run (no network)')
+    parser.add_argument('--digest', choices=sorted(PERIODS),
+                        help='Build the feed from the tweet store only (no network) for this period')
+    parser.add_argument('--list-id',
+                        help='With --digest, only include members of this list')
+    parser.add_argument('--rss-writer', choices=['stream', 'feedgen'], default='stream',
+                        help='Write the feed with the streaming lxml writer or with feedgen (default: stream)')
+    parser.add_argument('--formats', default='rss',
+                        help='Comma-separated feed formats to write: rss, atom, json (default: rss)')
+    parser.add_argument('--per-list-feeds', action='store_true',
+                        help='Also write one feed per list next to the combined one')
+
+def _add_report_args(parser):
+    parser.add_argument('--report',
+                        help='Write a JSON run report (stage timings, bytes, retries) to this file')
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'],
+                        help='Profile the run (main thread only; use with --concurrency 1 for a full picture)')
+    parser.add_argument('--profile-output',
+                        help='Where to write the profile (default: run_profile.prof / run_profile.html)')
+
+def _add_instance_args(parser):
+    parser.add_argument('--instances',
+                        help='Comma-separated Nitter base URLs to use instead of the built-in list')
+
+def fetch_parser():
+    parser = argparse.ArgumentParser(
+        prog='generate_rss.py [fetch]',
+        description='Generate an RSS digest from Twitter lists via Nitter',
+        epilog='Other commands: ' + '; '.join(f"{name}: {text}" for name, text in COMMANDS.items() if name != 'fetch')
+    )
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Number of accounts to fetch in parallel (default: 1)')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Ignore saved per-account state and re-parse every profile')
+    parser.add_argument('--stop-at-seen', action='store_true',
+                        help='Stop reading a timeline at the newest tweet an earlier run saw and reuse '
+                             'its stored copies of older ones (fewer pages, but their stats are from that run)')
+    parser.add_argument('--parser', choices=sorted(BACKENDS), default='lxml',
+                        help='HTML parser backend (default: lxml)')
+    _add_instance_args(parser)
+    parser.add_argument('--http2', action='store_true',
+                        help='Use httpx with HTTP/2 instead of requests (needs httpx[http2])')
+    parser.add_argument('--host-rate', type=float, default=1.0,
+                        help='Requests per second allowed to each Nitter instance (default: 1.0)')
+    parser.add_argument('--pool-size', type=int, default=None,
+                        help='Keep-alive connections per Nitter instance (default: max(10, concurrency))')
+    parser.add_argument('--cache-dir', default='.http_cache',
+                        help='On-disk cache of fetched Nitter pages (default: .http_cache)')
+    parser.add_argument('--cache-ttl', type=int, default=3600,
+                        help='Seconds a cached page is replayed instead of re-fetched (default: 3600)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the response cache')
+    parser.add_argument('--offline', action='store_true',
+                        help='Build the feed from cached pages only, whatever their age (no network)')
+    parser.add_argument('--checkpoint', default='run_checkpoint.jsonl',
+                        help='Progress file a restarted run resumes from (default: run_checkpoint.jsonl)')
+    parser.add_argument('--no-checkpoint', action='store_true',
+                        help='Neither resume from nor write a checkpoint')
+    parser.add_argument('--shard', type=parse_shard,
+                        help='Only fetch shard i of N (0-based, e.g. 0/4) and write a partial tweet file instead of the feed')
+    parser.add_argument('--partial-output',
+                        help='Where --shard writes its tweets (default: tweets_shard_<i>_of_<N>.json)')
+    parser.add_argument('--parse-workers', metavar='N|auto',
+                        help='Parse pages in N worker processes (auto: one per core) instead of on the fetch threads')
+    parser.add_argument('--max-pages', type=int, default=5,
+                        help='Timeline pages to follow per account while its tweets are still recent (default: 5)')
+    _add_ranking_args(parser)
+    _add_output_args(parser)
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep running: refresh accounts on a rolling schedule and serve the feeds over HTTP')
+    parser.add_argument('--serve', default='127.0.0.1:8080', metavar='HOST:PORT',
+                        help='With --daemon, where to serve the feeds (default: 127.0.0.1:8080)')
+    parser.add_argument('--active-interval', type=float, default=15,
+                        help='With --daemon, minutes between refreshes of the most active accounts (default: 15)')
+    parser.add_argument('--quiet-interval', type=float, default=120,
+                        help='With --daemon, minutes between refreshes of accounts that have not posted lately (default: 120)')
+    _add_report_args(parser)
+    return parser
+
+def render_parser():
+    parser = argparse.ArgumentParser(
+        prog='generate_rss.py render',
+        description='Write a feed from the tweet store (--digest, default daily) or from the partial '
+                    'files of a sharded run (--merge). Never touches the network or the page cache.'
+    )
+    _add_ranking_args(parser)
+    _add_output_args(parser)
+    _add_report_args(parser)
+    return parser
+
+def probe_parser():
+    parser = argparse.ArgumentParser(
+        prog='generate_rss.py probe',
+        description='Probe every Nitter instance, update instance_scoreboard.json and print it best first'
+    )
+    _add_instance_args(parser)
+    parser.add_argument('--report',
+                        help='Write a JSON run report to this file')
+    return parser
+
+def parse_args(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    command = argv.pop(0) if argv and argv[0] in COMMANDS else 'fetch'
+    if command == 'bench':
+        # The benchmark scripts parse their own arguments
+        return argparse.Namespace(command=command, bench_args=argv)
+    
+    parser = fetch_parser()
+    if command == 'fetch':
+        args = parser.parse_args(argv)
+    else:
+        # The other commands take a subset of fetch's options; start from fetch's defaults
+        defaults = parser.parse_args([])
+        parser = render_parser() if command == 'render' else probe_parser()
+        args = parser.parse_args(argv, namespace=defaults)
+    args.command = command
+    
+    if command == 'render':
+        if args.digest and args.merge:
+            parser.error("give either --digest or --merge")
+        if not args.merge:
+            args.digest = args.digest or 'daily'
+        args.no_cache = args.no_checkpoint = True
+    if args.daemon:
+        if args.shard or args.merge or args.digest:
+            parser.error("--daemon can't be combined with --shard, --merge or --digest")
+        from daemon import parse_address
+        try:
+            args.serve = parse_address(args.serve)
+        except argparse.ArgumentTypeError as e:
+            parser.error(f"--serve: {e}")
+    args.formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in args.formats if fmt not in WRITERS]
+    if unknown or not args.formats:
+        parser.error(f"--formats: unknown format(s) {', '.join(unknown)} (choose from {', '.join(WRITERS)})")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'bench':
+        sys.exit(bench(args.bench_args))
+    report = RunReport()
+    
+    try:
+        with profiled(args.profile, args.profile_output):
+            return probe(args, report) if args.command == 'probe' else run(args, report)
+    finally:
+        report.print_summary()
+        if args.report:
+            report.write(args.report)
+
+def bench(argv):
+    """Run benchmarks/bench_<name>.py with the remaining arguments; returns its exit status"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+    names = sorted(name[len('bench_'):-len('.py')] for name in os.listdir(directory)
+                   if name.startswith('bench_') and name.endswith('.py'))
+    if not argv or argv[0] not in names:
+        print(f"usage: generate_rss.py bench {{{','.join(names)}}} [benchmark options]")
+        return 2
+    import subprocess
+    return subprocess.call([sys.executable, os.path.join(directory, f"bench_{argv[0]}.py"), *argv[1:]])
+
+def probe(args, report):
+    """Probe every instance and print the scoreboard; exits 1 if none answered"""
+    generator = TwitterListRSSGenerator(
+        instances=args.instances.split(',') if args.instances else None,
+        store_path=None,
+        cache_dir=None,
+        checkpoint_path=None,
+        report=report
+    )
+    try:
+        healthy = generator.probe_instances()
+        print("\nScoreboard (the order the next run tries them in):")
+        for instance in generator.scoreboard.rank(generator.nitter_instances):
+            rate = generator.scoreboard.success_rate(instance)
+            latency = generator.scoreboard.median_latency(instance)
+            print(f"  {'✓' if instance in healthy else '✗'} {instance}: "
+                  f"{'-' if rate is None else f'{rate:.0%}'} of probes ok, "
+                  f"median {'-' if latency is None else f'{latency:.2f}s'}")
+        report.section('scoreboard', generator.scoreboard.snapshot())
+    finally:
+        generator.close()
+    if not healthy:
+        sys.exit(1)
+    return generator
+
+def run(args, report):
     print("=" * 70)
     print("Tech & AI Twitter RSS Generator")
     print("=" * 70)
@@ -299,7 +889,53 @@ def main():
     print()
     
     try:
-        generator = TwitterListRSSGenerator()
+        generator = TwitterListRSSGenerator(
+            concurrency=args.concurrency,
+            incremental=not args.full_refresh,
+            parser=args.parser,
+            instances=args.instances.split(',') if args.instances else None,
+            host_rate=args.host_rate,
+            top_k=args.top_k,
+            score=args.score,
+            max_per_author=args.max_per_author,
+            list_quota=args.list_quota,
+            parse_workers=args.parse_workers,
+            store_path=None if args.no_store else args.store,
+            report=report,
+            pool_size=args.pool_size,
+            http2=args.http2,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            cache_ttl=args.cache_ttl,
+            offline=args.offline,
+            checkpoint_path=None if args.no_checkpoint else args.checkpoint,
+            shard=args.shard,
+            max_pages=args.max_pages,
+            rss_writer=args.rss_writer,
+            formats=args.formats,
+            per_list_feeds=args.per_list_feeds,
+            dedup=not args.no_dedup,
+            dedup_threshold=args.dedup_threshold
+        )
+        generator.refresh_seen = not args.stop_at_seen
+        
+        # Digest from stored tweets only
+        if args.digest:
+            if not generator.store:
+                raise ValueError("--digest needs the tweet store (drop --no-store)")
+            tweets = generator.digest(args.digest, args.list_id)
+            print(f"Building {args.digest} digest from {generator.store.path}: {len(tweets)} tweets")
+            generator.generate_rss(tweets, output_file=args.output,
+                                   title=f'Tech & AI Twitter {args.digest.capitalize()} Digest')
+            generator.close()
+            return generator
+        
+        # Combine the partial files of a sharded run
+        if args.merge:
+            tweets = generator.merge_shards(args.merge)
+            report.incr('tweets_in_feed', len(tweets))
+            generator.write_feeds(tweets, output_file=args.output)
+            generator.close()
+            return generator
         
         # Your Twitter lists
         list_urls = [
@@ -325,9 +961,12 @@ def main():
             except Exception as e:
                 print(f"Error checking cache age: {e}")
         
-        if cached_accounts and cache_age_days < 7:
+        # Caches from before per-list feeds lack the list -> members map
+        lists_missing = args.per_list_feeds and not generator.list_members and not args.offline
+        if cached_accounts and (cache_age_days < 7 or args.offline) and not lists_missing:
             print(f"Using cached list members (cache age: {cache_age_days:.1f} days)")
             generator.accounts = cached_accounts
+            generator.store_list_members()
         else:
             print("Fetching fresh list members...")
             generator.accounts = generator.fetch_all_list_members(list_urls)
@@ -336,13 +975,28 @@ def main():
             else:
                 print("Failed to fetch list members, trying cache...")
                 generator.accounts = cached_accounts
+                generator.store_list_members()
         
         if not generator.accounts:
             print("\n❌ ERROR: No accounts found!")
             print("Creating empty RSS feed as fallback...")
-            generator.generate_rss([], output_file='tech_ai_twitter.xml')
-            print("Empty feed created at: tech_ai_twitter.xml")
-            return
+            generator.generate_rss([], output_file=args.output)
+            print(f"Empty feed created at: {args.output}")
+            generator.close()
+            return generator
+        
+        # Stay resident instead of one fetch-and-write pass
+        if args.daemon:
+            from daemon import FeedDaemon, FeedServer
+            server = FeedServer(*args.serve)
+            FeedDaemon(generator, list_urls, output_file=args.output, server=server,
+                       active_interval=args.active_interval * 60, quiet_interval=args.quiet_interval * 60,
+                       report_path=args.report).run()
+            generator.close()
+            return generator
+        
+        if args.shard:
+            generator.select_shard()
         
         print(f"\n✓ Monitoring {len(generator.accounts)} accounts")
         
@@ -350,43 +1004,59 @@ def main():
         print("\nFetching tweets...")
         tweets = generator.fetch_all_tweets()
         
+        # A shard leaves ranking and the feed to the merge step
+        if args.shard:
+            write_partial(args.partial_output or partial_path(args.shard), args.shard,
+                          generator.accounts, generator.shard_positions, generator.shard_tweets,
+                          generator.account_state.subset(generator.accounts))
+            if generator.checkpoint:
+                generator.checkpoint.clear()
+            generator.close()
+            return generator
+        
         # Generate RSS
         print(f"\nGenerating RSS feed...")
+        report.incr('tweets_in_feed', len(tweets))
         if tweets:
-            generator.generate_rss(tweets)
+            generator.write_feeds(tweets, output_file=args.output)
             print(f"✓ Done! RSS feed ready with {len(tweets)} tweets.")
         else:
             print("⚠️  No tweets fetched. Generating empty RSS feed...")
-            generator.generate_rss([], output_file='tech_ai_twitter.xml')
+            generator.write_feeds([], output_file=args.output)
             print("Created empty RSS feed as placeholder.")
         
         # Verify file was created
-        if os.path.exists('tech_ai_twitter.xml'):
-            file_size = os.path.getsize('tech_ai_twitter.xml')
-            print(f"\n✓ RSS file exists: tech_ai_twitter.xml ({file_size} bytes)")
+        if os.path.exists(args.output):
+            file_size = os.path.getsize(args.output)
+            print(f"\n✓ RSS file exists: {args.output} ({file_size} bytes)")
         else:
             print("\n❌ ERROR: RSS file was not created!")
+        
+        # Feed is out; a rerun should start over rather than resume
+        if generator.checkpoint:
+            generator.checkpoint.clear()
+        
+        generator.close()
+        return generator
             
     except Exception as e:
         print(f"\n❌ Fatal error: {e}")
         import traceback
         traceback.print_exc()
         
+        # Shards don't own the feed; the merge step decides what to publish
+        if args.shard:
+            raise
+        
         # Create emergency empty RSS feed
         print("\nCreating emergency RSS feed...")
         try:
-            from feedgen.feed import FeedGenerator
-            fg = FeedGenerator()
-            fg.id('https://yourdomain.com/tech-ai-twitter')
-            fg.title('Tech & AI Twitter Daily Digest')
-            fg.author({'name': 'Twitter List Aggregator'})
-            fg.link(href='https://yourdomain.com/tech-ai-twitter', rel='alternate')
-            fg.subtitle('Error generating feed - see logs')
-            fg.language('en')
-            fg.updated(datetime.now(timezone.utc))
-            fg.rss_file('tech_ai_twitter.xml')
+            write_rss([], args.output, 'Tech & AI Twitter Daily Digest', subtitle='Error generating feed - see logs')
             print("✓ Emergency RSS feed created")
         except Exception as e2:
             print(f"❌ Could not create emergency feed: {e2}")
         
         raise
+
+if __name__ == '__main__':
+    main()
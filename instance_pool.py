@@ -0,0 +1,219 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from instrumentation import RunReport
+from rate_limit import AdaptiveBucket, parse_retry_after
+from response_cache import CachedResponse
+
+
+class InstancePool:
+    """Spreads requests over all healthy Nitter instances and fails over on errors"""
+    def __init__(self, instances, rate=1.0, burst=2, report=None, scoreboard=None, cache=None, offline=False):
+        # Mirrors that did well in earlier runs come first; last run's dead ones go last
+        self.scoreboard = scoreboard
+        self.instances = scoreboard.rank(instances) if scoreboard else list(instances)
+        self.probed = False
+        # Optional ResponseCache; offline serves only from it
+        self.cache = cache
+        self.offline = offline
+        self.report = report or RunReport()
+        self._lock = threading.Lock()
+        self.stats = {
+            instance: {
+                'healthy': True,
+                'requests': 0,
+                'errors': 0,
+                'latency': scoreboard.median_latency(instance) if scoreboard else None,
+                'bucket': AdaptiveBucket(rate, burst)
+            }
+            for instance in self.instances
+        }
+
+    def probe(self, session, timeout=(3.05, 10)):
+        """Probe every instance in parallel and mark which ones answer
+
+        The short connect timeout means a dead mirror costs ~3s, all of them at once,
+        as long as `session` doesn't retry connects (see probe_instances() in generate_rss.py).
+        """
+        def check(instance):
+            started = time.monotonic()
+            try:
+                response = session.get(instance, timeout=timeout)
+                return instance, response.status_code == 200, time.monotonic() - started
+            except requests.RequestException:
+                return instance, False, time.monotonic() - started
+
+        with ThreadPoolExecutor(max_workers=len(self.instances)) as executor:
+            results = list(executor.map(check, self.instances))
+
+        for instance, ok, latency in results:
+            self.record(instance, latency, ok)
+            self.stats[instance]['healthy'] = ok
+            print(f"  {'✓' if ok else '✗'} {instance} ({latency:.2f}s)")
+            if self.scoreboard:
+                self.scoreboard.record(instance, ok, latency)
+
+        if self.scoreboard:
+            self.scoreboard.save()
+        self.probed = True
+        healthy = self.healthy()
+        print(f"Healthy Nitter instances: {len(healthy)}/{len(self.instances)}")
+        return healthy
+
+    def healthy(self):
+        """Healthy instances, fastest first"""
+        live = [i for i in self.instances if self.stats[i]['healthy']]
+        return sorted(live, key=lambda i: self.stats[i]['latency'] or 0)
+
+    def best(self):
+        """Fastest healthy instance, or the first configured one as a fallback"""
+        healthy = self.healthy()
+        return healthy[0] if healthy else self.instances[0]
+
+    def error_rate(self, instance):
+        stats = self.stats[instance]
+        return stats['errors'] / stats['requests'] if stats['requests'] else 0.0
+
+    def record(self, instance, latency, ok, status=None, retry_after=None):
+        """Update latency (EWMA), error counters and the host's rate limiter after a request"""
+        with self._lock:
+            now = time.monotonic()
+            stats = self.stats[instance]
+            bucket = stats['bucket']
+            stats['requests'] += 1
+            if stats['latency'] is None:
+                stats['latency'] = latency
+            else:
+                stats['latency'] = 0.8 * stats['latency'] + 0.2 * latency
+            if ok:
+                bucket.on_success(now)
+                return
+            stats['errors'] += 1
+            if status in (429, 503):
+                # Being rate limited says nothing about health; the bucket slows down instead
+                bucket.on_throttle(now, parse_retry_after(retry_after))
+                return
+            bucket.on_error(now)
+            # Give up on a mirror that keeps failing mid-run
+            if stats['requests'] >= 4 and self.error_rate(instance) > 0.5:
+                stats['healthy'] = False
+
+    def acquire(self, exclude=()):
+        """Pick the instance that can serve soonest and wait for its token"""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [
+                i for i in self.instances
+                if i not in exclude and self.stats[i]['healthy'] and self.stats[i]['bucket'].blocked_until <= now
+            ]
+            if not candidates:
+                # Nothing healthy and unblocked left; try anything we haven't tried yet,
+                # waiting out its Retry-After/backoff if it is blocked
+                candidates = [i for i in self.instances if i not in exclude]
+            if not candidates:
+                return None
+
+            def ready_in(i):
+                bucket = self.stats[i]['bucket']
+                return max(bucket.wait_time(now), bucket.blocked_until - now)
+
+            instance = min(candidates, key=lambda i: ready_in(i) + (self.stats[i]['latency'] or 0))
+            bucket = self.stats[instance]['bucket']
+            wait = max(bucket.reserve(now), bucket.blocked_until - now)
+
+        if wait > 0:
+            time.sleep(wait)
+        return instance
+
+    def get(self, session, path, timeout=15, headers_for=None):
+        """GET path from the pool, moving to another instance on 429, 5xx or connection errors
+
+        headers_for(instance) can supply per-instance request headers; the serving
+        instance is recorded on the response as `response.instance`. With a cache,
+        fresh cached pages are returned without a request; offline, a cache miss
+        comes back as a 504 (like HTTP's only-if-cached).
+        """
+        if self.cache:
+            cached = self.cache.get(path, max_age=None if self.offline else self.cache.ttl)
+            if cached is not None:
+                self.report.incr('cache_hits')
+                return cached
+            self.report.incr('cache_misses')
+            if self.offline:
+                return CachedResponse(504)
+
+        tried = set()
+        response = None
+        error = None
+
+        while len(tried) < len(self.instances):
+            instance = self.acquire(exclude=tried)
+            if instance is None:
+                break
+            if tried:
+                self.report.incr('http_retries')
+            tried.add(instance)
+
+            headers = headers_for(instance) if headers_for else None
+            started = time.monotonic()
+            try:
+                response = session.get(f"{instance}{path}", timeout=timeout, headers=headers)
+            except requests.RequestException as e:
+                self.record(instance, time.monotonic() - started, False)
+                self.report.incr('http_errors')
+                error = e
+                continue
+            latency = time.monotonic() - started
+            self.report.add_time('http', latency)
+            # Time until the response headers were parsed (connect + server wait)
+            self.report.add_time('http_ttfb', response.elapsed.total_seconds())
+            self.report.incr('http_requests')
+            self.report.incr('http_bytes', len(response.content))
+            self.report.incr('http_wire_bytes', getattr(response, 'wire_bytes', len(response.content)))
+            self.report.incr(f'http_status_{response.status_code}')
+
+            if response.status_code == 429 or response.status_code >= 500:
+                self.record(instance, latency, False, response.status_code, response.headers.get('Retry-After'))
+                self.report.incr('http_throttled' if response.status_code in (429, 503) else 'http_server_errors')
+                continue
+
+            self.record(instance, latency, True)
+            response.instance = instance
+            if self.cache and response.status_code == 200:
+                self.cache.put(path, response, instance)
+            return response
+
+        if response is None and error is not None:
+            raise error
+        return response
+
+    def snapshot(self):
+        """Per-instance stats as plain data (for the run report)"""
+        return {
+            instance: {
+                'healthy': stats['healthy'],
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'error_rate': round(self.error_rate(instance), 3),
+                'latency_ms': round((stats['latency'] or 0) * 1000, 1),
+                'limiter': stats['bucket'].state()
+            }
+            for instance, stats in self.stats.items()
+        }
+
+    def summary(self):
+        """Print per-instance request counts, error rate and latency"""
+        print("\nInstance usage:")
+        for instance in self.instances:
+            stats = self.stats[instance]
+            if not stats['requests']:
+                continue
+            limiter = stats['bucket'].state()
+            print(f"  {instance}: {stats['requests']} requests, "
+                  f"{self.error_rate(instance):.0%} errors, "
+                  f"{stats['latency'] or 0:.2f}s avg latency, "
+                  f"rate {limiter['rate']}/s (low {limiter['lowest_rate']}/s, "
+                  f"{limiter['throttles']} throttles, {limiter['backoff_seconds']}s backoff)")
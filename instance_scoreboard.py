@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+
+class InstanceScoreboard:
+    """Probe history per Nitter instance, kept across runs to order mirrors at startup"""
+    def __init__(self, scoreboard_file='instance_scoreboard.json', history=20):
+        self.scoreboard_file = scoreboard_file
+        self.history = history
+        self.instances = {}
+
+    def load(self):
+        """Load saved scores if available"""
+        if os.path.exists(self.scoreboard_file):
+            try:
+                with open(self.scoreboard_file, 'r') as f:
+                    self.instances = json.load(f).get('instances', {})
+            except Exception as e:
+                print(f"Error loading instance scoreboard: {e}")
+                self.instances = {}
+        return self.instances
+
+    def save(self):
+        """Save scores atomically"""
+        tmp_file = f"{self.scoreboard_file}.tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({
+                    'instances': self.instances,
+                    'updated_at': datetime.now(timezone.utc).isoformat()
+                }, f, indent=1)
+            os.replace(tmp_file, self.scoreboard_file)
+        except Exception as e:
+            print(f"Error saving instance scoreboard: {e}")
+
+    def record(self, instance, ok, latency, now=None):
+        """Add one probe result; only the last `history` results are kept"""
+        now = now or time.time()
+        entry = self.instances.setdefault(instance, {
+            'results': [],
+            'latencies_ms': [],
+            'last_good': None,
+            'last_checked': None
+        })
+        entry['results'] = (entry['results'] + [1 if ok else 0])[-self.history:]
+        entry['last_checked'] = now
+        if ok:
+            entry['latencies_ms'] = (entry['latencies_ms'] + [round(latency * 1000, 1)])[-self.history:]
+            entry['last_good'] = now
+
+    def success_rate(self, instance):
+        results = self.instances.get(instance, {}).get('results')
+        return sum(results) / len(results) if results else None
+
+    def median_latency(self, instance):
+        """Median latency of successful probes in seconds, or None"""
+        from statistics import median  # not at module level: statistics is slow to import
+        latencies = self.instances.get(instance, {}).get('latencies_ms')
+        return median(latencies) / 1000 if latencies else None
+
+    def was_down(self, instance):
+        """True if the most recent probe of this instance failed"""
+        entry = self.instances.get(instance)
+        return bool(entry and entry['results'] and not entry['results'][-1])
+
+    def rank(self, instances):
+        """Known-good mirrors first (by success rate, then latency), unknown next, last-seen-dead last"""
+        def key(instance):
+            rate = self.success_rate(instance)
+            latency = self.median_latency(instance)
+            return (
+                self.was_down(instance),
+                rate is None,
+                -(rate or 0),
+                latency if latency is not None else float('inf')
+            )
+        return sorted(instances, key=key)
+
+    def snapshot(self):
+        """Per-instance scores as plain data (for the run report)"""
+        return {
+            instance: {
+                'success_rate': round(self.success_rate(instance) or 0, 3),
+                'median_latency_ms': round((self.median_latency(instance) or 0) * 1000, 1),
+                'last_good': entry['last_good']
+            }
+            for instance, entry in self.instances.items()
+        }
@@ -0,0 +1,149 @@
+"""Per-stage timers and counters for a run, written out as a JSON report.
+
+    report = RunReport()
+    with report.stage('parse'):
+        ...
+    report.incr('http_bytes', len(body))
+    report.write('run_report.json')
+
+Stages keep every sample so the report can give percentiles; a run has at
+most a few thousand requests, so this stays small. Safe to use from threads.
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[index]
+
+
+class RunReport:
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.counters = {}
+        self.sections = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one sample of stage `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        """Start a fresh set of samples and counters (the daemon reports per refresh)"""
+        with self._lock:
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+            self.samples = {}
+            self.counters = {}
+
+    def section(self, name, data):
+        """Attach free-form data (e.g. per-instance stats) to the report"""
+        with self._lock:
+            self.sections[name] = data
+
+    def stage_stats(self, name):
+        values = self.samples.get(name, [])
+        return {
+            'count': len(values),
+            'total_seconds': round(sum(values), 4),
+            'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+            'p50_ms': round(percentile(values, 50) * 1000, 3),
+            'p95_ms': round(percentile(values, 95) * 1000, 3),
+            'max_ms': round(max(values) * 1000, 3) if values else 0.0
+        }
+
+    def to_dict(self):
+        with self._lock:
+            names = list(self.samples)
+            counters = dict(self.counters)
+            sections = dict(self.sections)
+        return {
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(time.perf_counter() - self._started, 3),
+            'stages': {name: self.stage_stats(name) for name in names},
+            'counters': counters,
+            **sections
+        }
+
+    def write(self, path):
+        """Write the report atomically"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        print(f"Run report written to {path}")
+
+    def print_summary(self):
+        print("\nStage timings:")
+        for name in list(self.samples):
+            stats = self.stage_stats(name)
+            print(f"  {name:<14} {stats['count']:>6}x  total {stats['total_seconds']:>8.2f}s  "
+                  f"p50 {stats['p50_ms']:>8.1f}ms  p95 {stats['p95_ms']:>8.1f}ms")
+        if self.counters:
+            print("Counters: " + ", ".join(f"{k}={v:,}" for k, v in sorted(self.counters.items())))
+
+
+@contextmanager
+def profiled(kind=None, output=None):
+    """Run the enclosed block under cProfile or pyinstrument (None: no profiling)
+
+    Both profilers only see the main thread, so use --concurrency 1 for a full picture.
+    """
+    if kind == 'cprofile':
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            output = output or 'run_profile.prof'
+            profiler.dump_stats(output)
+            print(f"\ncProfile stats written to {output}")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+    elif kind == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument is not installed (pip install pyinstrument); running without profiling")
+            yield
+            return
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            output = output or 'run_profile.html'
+            with open(output, 'w') as f:
+                f.write(profiler.output_html())
+            print(f"\npyinstrument profile written to {output}")
+            print(profiler.output_text(unicode=True))
+    else:
+        yield
@@ -0,0 +1,346 @@
+"""Parser backends for Nitter pages.
+
+Every backend exposes the same small interface so the scraper doesn't care
+which HTML library is underneath:
+
+    items = backend.timeline_items(html, max_items)   # first N timeline items only
+    items, cursor = backend.timeline_page(html)      # all items, plus the "Load more" cursor
+    backend.timeline_page(html, until)               # 'stream' stops at the first item until(item) accepts
+    backend.is_retweet(item), backend.is_pinned(item)
+    backend.link(item), backend.text(item), backend.stats(item)
+    backend.date_title(item), backend.date_text(item)  # 'Oct 3, 2024 · 5:07 PM UTC', '5h'
+    backend.usernames(html)
+    backend.members_page(html)                       # (usernames, next cursor or None)
+
+Item accessors are separate calls so callers only pay for the fields they use.
+"""
+from urllib.parse import parse_qs, urlsplit
+
+from nitter_values import parse_count
+
+
+def cursor_from_href(href):
+    """'?cursor=DAABCg...' -> 'DAABCg...' (None if the link has no cursor)"""
+    values = parse_qs(urlsplit(href or '').query).get('cursor')
+    return values[0] if values else None
+
+
+def _last_cursor(hrefs):
+    # Nitter puts "Load newest" above and "Load more" below the timeline; the
+    # last cursor link on the page is the one that moves forward
+    cursor = None
+    for href in hrefs:
+        cursor = cursor_from_href(href) or cursor
+    return cursor
+
+
+# icon class -> tweet dict key
+STAT_ICONS = {
+    'icon-retweet': 'retweets',
+    'icon-heart': 'likes',
+    'icon-comment': 'replies'
+}
+
+
+def _has_class(el, cls):
+    return cls in (el.get('class') or '').split()
+
+
+def _find(el, tag, cls):
+    """First descendant of el with the given tag and class (like bs4's find)"""
+    for child in el.iterdescendants(tag):
+        if _has_class(child, cls):
+            return child
+    return None
+
+
+def _text(el):
+    # Same joining rule as bs4's get_text(strip=True)
+    return ''.join(s.strip() for s in el.itertext())
+
+
+class LxmlBackend:
+    """libxml2 tree parser; walks only as far as the first N timeline items"""
+    name = 'lxml'
+
+    def __init__(self):
+        import lxml.html
+        self._fromstring = lxml.html.fromstring
+
+    def _root(self, html):
+        return self._fromstring(html)
+
+    def timeline_items(self, html, max_items):
+        items = []
+        for el in self._root(html).iter('div'):
+            if _has_class(el, 'timeline-item'):
+                items.append(el)
+                if len(items) >= max_items:
+                    break
+        return items
+
+    def timeline_page(self, html, until=None):
+        items, hrefs = [], []
+        for el in self._root(html).iter('div'):
+            if _has_class(el, 'timeline-item'):
+                items.append(el)
+            elif _has_class(el, 'show-more'):
+                hrefs.extend(a.get('href') for a in el.iterdescendants('a'))
+        return items, _last_cursor(hrefs)
+
+    def usernames(self, html):
+        return self.members_page(html)[0]
+
+    def members_page(self, html):
+        usernames, hrefs = [], []
+        for el in self._root(html).iter('a', 'div'):
+            if el.tag == 'a' and _has_class(el, 'username'):
+                usernames.append(_text(el).replace('@', ''))
+            elif el.tag == 'div' and _has_class(el, 'show-more'):
+                hrefs.extend(a.get('href') for a in el.iterdescendants('a'))
+        return usernames, _last_cursor(hrefs)
+
+    def is_retweet(self, item):
+        return _find(item, 'div', 'retweet-header') is not None
+
+    def is_pinned(self, item):
+        return _find(item, 'div', 'pinned') is not None
+
+    def link(self, item):
+        link_elem = _find(item, 'a', 'tweet-link')
+        return link_elem.get('href', '') if link_elem is not None else None
+
+    def text(self, item):
+        content = _find(item, 'div', 'tweet-content')
+        return _text(content) if content is not None else None
+
+    def stats(self, item):
+        counts = {'likes': 0, 'retweets': 0, 'replies': 0}
+        stats = _find(item, 'div', 'tweet-stats')
+        if stats is None:
+            return counts
+        for span in stats.iterdescendants('span'):
+            if not _has_class(span, 'tweet-stat'):
+                continue
+            icon = _find(span, 'span', 'icon')
+            num_span = _find(span, 'span', 'icon-text')
+            if icon is None or num_span is None:
+                continue
+            for cls in icon.get('class', '').split():
+                if cls in STAT_ICONS:
+                    counts[STAT_ICONS[cls]] = parse_count(_text(num_span))
+                    break
+        return counts
+
+    def date_title(self, item):
+        date_elem = _find(item, 'span', 'tweet-date')
+        if date_elem is None:
+            return None
+        for a in date_elem.iterdescendants('a'):
+            return a.get('title')
+        return None
+
+    def date_text(self, item):
+        date_elem = _find(item, 'span', 'tweet-date')
+        if date_elem is None:
+            return None
+        for a in date_elem.iterdescendants('a'):
+            return _text(a)
+        return None
+
+
+class StreamingBackend(LxmlBackend):
+    """lxml pull parser fed in chunks; stops reading once N timeline items are complete"""
+    name = 'stream'
+    chunk_size = 16 * 1024
+
+    def __init__(self):
+        super().__init__()
+        from lxml import etree
+        self._pull_parser = etree.HTMLPullParser
+
+    def _divs(self, html):
+        """Each <div> as soon as its end tag has been read"""
+        parser = self._pull_parser(events=('end',), tag='div')
+        for start in range(0, len(html), self.chunk_size):
+            parser.feed(html[start:start + self.chunk_size])
+            for _, el in parser.read_events():
+                yield el
+        parser.close()
+        for _, el in parser.read_events():
+            yield el
+
+    def timeline_items(self, html, max_items):
+        items = []
+        for el in self._divs(html):
+            if _has_class(el, 'timeline-item'):
+                items.append(el)
+                if len(items) >= max_items:
+                    break
+        return items
+
+    def timeline_page(self, html, until=None):
+        # The "Load more" link is below the timeline, so stopping early leaves no
+        # cursor; the scan ends at that item anyway
+        items, hrefs = [], []
+        for el in self._divs(html):
+            if _has_class(el, 'timeline-item'):
+                items.append(el)
+                if until is not None and until(el):
+                    return items, None
+            elif _has_class(el, 'show-more'):
+                hrefs.extend(a.get('href') for a in el.iterdescendants('a'))
+        return items, _last_cursor(hrefs)
+
+
+class SoupBackend:
+    """BeautifulSoup with html.parser (the original, slowest path)"""
+    name = 'bs4'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def timeline_items(self, html, max_items):
+        soup = self._soup(html, 'html.parser')
+        return soup.find_all('div', class_='timeline-item', limit=max_items)
+
+    def timeline_page(self, html, until=None):
+        soup = self._soup(html, 'html.parser')
+        hrefs = [a.get('href') for div in soup.find_all('div', class_='show-more') for a in div.find_all('a')]
+        return soup.find_all('div', class_='timeline-item'), _last_cursor(hrefs)
+
+    def usernames(self, html):
+        return self.members_page(html)[0]
+
+    def members_page(self, html):
+        soup = self._soup(html, 'html.parser')
+        usernames = [a.get_text(strip=True).replace('@', '') for a in soup.find_all('a', class_='username')]
+        hrefs = [a.get('href') for div in soup.find_all('div', class_='show-more') for a in div.find_all('a')]
+        return usernames, _last_cursor(hrefs)
+
+    def is_retweet(self, item):
+        return item.find('div', class_='retweet-header') is not None
+
+    def is_pinned(self, item):
+        return item.find('div', class_='pinned') is not None
+
+    def link(self, item):
+        link_elem = item.find('a', class_='tweet-link')
+        return link_elem.get('href', '') if link_elem else None
+
+    def text(self, item):
+        content = item.find('div', class_='tweet-content')
+        return content.get_text(strip=True) if content else None
+
+    def stats(self, item):
+        counts = {'likes': 0, 'retweets': 0, 'replies': 0}
+        stats = item.find('div', class_='tweet-stats')
+        if not stats:
+            return counts
+        for span in stats.find_all('span', class_='tweet-stat'):
+            icon = span.find('span', class_='icon')
+            num_span = span.find('span', class_='icon-text')
+            if icon and num_span:
+                for cls in icon.get('class', []):
+                    if cls in STAT_ICONS:
+                        counts[STAT_ICONS[cls]] = parse_count(num_span.get_text(strip=True))
+                        break
+        return counts
+
+    def date_title(self, item):
+        date_elem = item.find('span', class_='tweet-date')
+        if date_elem:
+            date_link = date_elem.find('a')
+            if date_link:
+                return date_link.get('title')
+        return None
+
+    def date_text(self, item):
+        date_elem = item.find('span', class_='tweet-date')
+        if date_elem:
+            date_link = date_elem.find('a')
+            if date_link:
+                return date_link.get_text(strip=True)
+        return None
+
+
+class SelectolaxBackend:
+    """selectolax (lexbor) CSS-selector backend, if the package is installed"""
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def timeline_items(self, html, max_items):
+        return self._parser(html).css('div.timeline-item')[:max_items]
+
+    def timeline_page(self, html, until=None):
+        tree = self._parser(html)
+        hrefs = [a.attributes.get('href') for a in tree.css('div.show-more a')]
+        return tree.css('div.timeline-item'), _last_cursor(hrefs)
+
+    def usernames(self, html):
+        return self.members_page(html)[0]
+
+    def members_page(self, html):
+        tree = self._parser(html)
+        usernames = [a.text(strip=True).replace('@', '') for a in tree.css('a.username')]
+        hrefs = [a.attributes.get('href') for a in tree.css('div.show-more a')]
+        return usernames, _last_cursor(hrefs)
+
+    def is_retweet(self, item):
+        return item.css_first('div.retweet-header') is not None
+
+    def is_pinned(self, item):
+        return item.css_first('div.pinned') is not None
+
+    def link(self, item):
+        link_elem = item.css_first('a.tweet-link')
+        return (link_elem.attributes.get('href') or '') if link_elem is not None else None
+
+    def text(self, item):
+        content = item.css_first('div.tweet-content')
+        if content is None:
+            return None
+        return ''.join(node.text(deep=False, strip=True) for node in content.traverse(include_text=True)
+                       if node.tag == '-text')
+
+    def stats(self, item):
+        counts = {'likes': 0, 'retweets': 0, 'replies': 0}
+        for span in item.css('div.tweet-stats span.tweet-stat'):
+            icon = span.css_first('span.icon')
+            num_span = span.css_first('span.icon-text')
+            if icon is None or num_span is None:
+                continue
+            for cls in (icon.attributes.get('class') or '').split():
+                if cls in STAT_ICONS:
+                    counts[STAT_ICONS[cls]] = parse_count(num_span.text(strip=True))
+                    break
+        return counts
+
+    def date_title(self, item):
+        date_link = item.css_first('span.tweet-date a')
+        return date_link.attributes.get('title') if date_link is not None else None
+
+    def date_text(self, item):
+        date_link = item.css_first('span.tweet-date a')
+        return date_link.text(strip=True) if date_link is not None else None
+
+
+BACKENDS = {
+    'lxml': LxmlBackend,
+    'stream': StreamingBackend,
+    'bs4': SoupBackend,
+    'selectolax': SelectolaxBackend
+}
+
+
+def get_backend(name='lxml'):
+    """Instantiate a parser backend, falling back to bs4 if its library is missing"""
+    try:
+        return BACKENDS[name]()
+    except ImportError as e:
+        print(f"Parser backend '{name}' unavailable ({e}), falling back to bs4")
+        return SoupBackend()
@@ -0,0 +1,105 @@
+"""Parsing of the small values on Nitter pages: dates and stat counts.
+
+These run for every tweet, so they avoid strptime (slow, and locale
+dependent for month names) and datetime objects altogether: precompiled
+regexes plus calendar.timegm straight to epoch seconds (UTC).
+
+    parse_date_title('Oct 3, 2024 · 5:07 PM UTC')   # absolute date from the link's title
+    parse_relative_date('5h', now)                  # the link text: 'now', '45s', '5m', '5h', 'Oct 3', 'Oct 3, 2023'
+    parse_count('1.2K')                             # 1200
+"""
+import calendar
+import re
+import time
+from functools import lru_cache
+
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1
+    )
+}
+
+DATE_TITLE = re.compile(r'([A-Za-z]{3})[a-z]* (\d{1,2}), (\d{4})\D+(\d{1,2}):(\d{2})(?::(\d{2}))? ?([AaPp][Mm])?')
+RELATIVE_AGE = re.compile(r'(\d+)\s*([smhd])$')
+MONTH_DAY = re.compile(r'([A-Za-z]{3})[a-z]* (\d{1,2})(?:, (\d{4}))?$')
+COUNT = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([KkMmBb]?)$')
+
+UNIT_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+COUNT_SCALE = {'': 1, 'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000}
+
+
+def _epoch(year, month, day, hour=0, minute=0, second=0):
+    # timegm happily rolls Feb 30 over into March, so range-check first
+    if not (1 <= day <= calendar.monthrange(year, month)[1] and hour < 24 and minute < 60 and second < 61):
+        return None
+    return float(calendar.timegm((year, month, day, hour, minute, second)))
+
+
+@lru_cache(maxsize=4096)
+def parse_date_title(title):
+    """'Oct 3, 2024 · 5:07 PM UTC' -> epoch seconds, or None if it doesn't look like a date
+
+    Titles repeat a lot (same minute, pinned tweets, revisited accounts), hence the cache.
+    """
+    if not title:
+        return None
+    match = DATE_TITLE.match(title.strip())
+    if match is None:
+        return None
+    month_name, day, year, hour, minute, second, meridiem = match.groups()
+    month = MONTHS.get(month_name.lower())
+    if month is None:
+        return None
+    hour = int(hour)
+    if meridiem:
+        if hour > 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.upper() == 'PM' else 0)
+    return _epoch(int(year), month, int(day), hour, int(minute), int(second or 0))
+
+
+def parse_relative_date(text, now=None):
+    """Nitter's short date text -> epoch seconds, or None
+
+    'now' / '45s' / '5m' / '5h' / '2d' count back from now; 'Oct 3' is this
+    year (or last year if that would be in the future); 'Oct 3, 2023' is
+    taken as is. Dates without a time of day resolve to midnight UTC.
+    """
+    if not text:
+        return None
+    now = time.time() if now is None else now
+    text = text.strip()
+    if text.lower() == 'now':
+        return now
+    match = RELATIVE_AGE.match(text)
+    if match:
+        return now - int(match.group(1)) * UNIT_SECONDS[match.group(2)]
+    match = MONTH_DAY.match(text)
+    if match is None:
+        return None
+    month = MONTHS.get(match.group(1).lower())
+    if month is None:
+        return None
+    day = int(match.group(2))
+    year = int(match.group(3)) if match.group(3) else time.gmtime(now).tm_year
+    when = _epoch(year, month, day)
+    if when is not None and not match.group(3) and when > now + 86400:
+        when = _epoch(year - 1, month, day)
+    return when
+
+
+def parse_count(text):
+    """Stat count like '1,234', '1.2K' or '3M' -> int (0 if empty or unparseable)"""
+    if not text:
+        return 0
+    if text.isdigit():  # The common case: a plain small number
+        return int(text)
+    match = COUNT.match(text.strip())
+    if match is None:
+        return 0
+    number, suffix = match.groups()
+    number = number.replace(',', '')
+    if not suffix and '.' not in number:
+        return int(number)
+    return int(round(float(number) * COUNT_SCALE[suffix.lower()]))
@@ -0,0 +1,199 @@
+"""Timeline page parsing, on the fetch thread or in a pool of worker processes.
+
+parse_timeline() turns one page of a profile timeline into Tweet records.
+It applies the scraper's rules: skip retweets, stop at the first tweet
+already seen or older than the cutoff (pinned tweets excepted), and
+de-duplicate by URL. It is a plain function of its arguments, so it runs
+the same anywhere.
+
+Parsing is CPU-bound, and with bs4 it holds the GIL. Once many fetch threads
+overlap their network waits, parsing on those threads caps throughput at
+one core. ParsePool moves it to a ProcessPoolExecutor sized to the CPU
+count. A fetch thread hands over the raw page bytes and waits for the
+records; while it waits it holds one of a bounded number of slots, so
+fetchers block (backpressure) instead of queueing pages without limit
+when parsing falls behind.
+
+    pool = ParsePool('lxml', workers=None)    # None: one worker per core
+    page = pool.parse(html, 'karpathy', last_seen_id, cutoff, 100, seen_urls)
+    page.tweets, page.cursor, page.done
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from account_state import tweet_id_from_url
+from nitter_parser import get_backend
+from nitter_values import parse_date_title, parse_relative_date
+from tweet import Tweet
+
+
+class TimelinePage:
+    """Result of parsing one timeline page (picklable, so it can come back from a worker)"""
+    __slots__ = ('tweets', 'newest_id', 'cursor', 'done', 'dates_unparsed', 'parse_seconds')
+
+    def __init__(self, tweets, newest_id, cursor, done, dates_unparsed, parse_seconds):
+        self.tweets = tweets
+        self.newest_id = newest_id
+        self.cursor = cursor
+        self.done = done
+        self.dates_unparsed = dates_unparsed
+        self.parse_seconds = parse_seconds
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+def _ends_scan(backend, item, last_seen_id, cutoff):
+    """True for the item the loop in parse_timeline stops at (seen before, or too old)"""
+    try:
+        if backend.is_retweet(item) or backend.is_pinned(item):
+            return False
+        tweet_path = backend.link(item)
+        tweet_id = tweet_id_from_url(tweet_path) if tweet_path else None
+        if tweet_id and last_seen_id and tweet_id <= last_seen_id:
+            return True
+        timestamp = parse_date_title(backend.date_title(item))
+        if timestamp is None:
+            timestamp = parse_relative_date(backend.date_text(item))
+        return timestamp is not None and timestamp <= cutoff
+    except Exception:
+        return False
+
+
+def parse_timeline(backend, html, username, last_seen_id, cutoff, max_tweets, seen_urls=()):
+    """Parse one timeline page into a TimelinePage
+
+    done is set when the scan should not go on to the next page: a tweet
+    already seen (id <= last_seen_id), one older than cutoff (epoch seconds),
+    or max_tweets reached. URLs in seen_urls (earlier pages) are skipped.
+    """
+    started = time.perf_counter()
+    # Only a streaming backend calls this, to skip parsing the rest of the page
+    tweet_items, cursor = backend.timeline_page(html, lambda item: _ends_scan(backend, item, last_seen_id, cutoff))
+    tweets = []
+    seen_urls = set(seen_urls)
+    newest_id = None
+    done = False
+    dates_unparsed = 0
+
+    for item in tweet_items:
+        try:
+            # Skip retweets
+            if backend.is_retweet(item):
+                continue
+
+            # Stop at the first tweet an earlier run already parsed (pinned
+            # tweets sit above the timeline regardless of age)
+            tweet_path = backend.link(item)
+            pinned = backend.is_pinned(item)
+            tweet_id = tweet_id_from_url(tweet_path) if tweet_path else None
+            if tweet_id and not pinned:
+                if last_seen_id and tweet_id <= last_seen_id:
+                    done = True
+                    break
+                newest_id = max(newest_id or 0, tweet_id)
+
+            # Date first, so items outside the window cost no content/stats parsing:
+            # the link's title has the full date, its text a relative one ("5h",
+            # "Oct 3"); treat the tweet as new if neither parses
+            timestamp = parse_date_title(backend.date_title(item))
+            if timestamp is None:
+                timestamp = parse_relative_date(backend.date_text(item))
+            if timestamp is None:
+                dates_unparsed += 1
+                timestamp = time.time()
+
+            if timestamp <= cutoff:
+                if pinned:
+                    continue
+                # Timeline is newest-first: nothing further down is recent either
+                done = True
+                break
+
+            # Extract tweet link
+            if tweet_path is None:
+                continue
+            tweet_url = f"https://twitter.com{tweet_path}"
+            if tweet_url in seen_urls:
+                continue
+
+            # Extract tweet content
+            text = backend.text(item)
+            if text is None:
+                continue
+
+            # Skip if too short (likely just a link)
+            if len(text) < 20:
+                continue
+
+            # Extract stats
+            stats = backend.stats(item)
+
+            seen_urls.add(tweet_url)
+            tweets.append(Tweet(
+                author=username,
+                text=text,
+                url=tweet_url,
+                likes=stats['likes'],
+                retweets=stats['retweets'],
+                replies=stats['replies'],
+                timestamp=timestamp
+            ))
+            if len(tweets) >= max_tweets:
+                done = True
+                break
+
+        except Exception:
+            continue
+
+    return TimelinePage(tweets, newest_id, cursor, done, dates_unparsed, time.perf_counter() - started)
+
+
+# Workers start on the first submit, i.e. on a fetch thread; a forked child could
+# inherit a lock another thread holds at that moment and hang on it. Children of
+# the fork server (or spawned ones) start from a clean, single-threaded process.
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Each worker process builds its parser backend once
+_worker_backend = None
+
+
+def _init_worker(parser):
+    global _worker_backend
+    _worker_backend = get_backend(parser)
+
+
+def _parse_in_worker(html, username, last_seen_id, cutoff, max_tweets, seen_urls):
+    return parse_timeline(_worker_backend, html, username, last_seen_id, cutoff, max_tweets, seen_urls)
+
+
+class ParsePool:
+    """Process pool for parse_timeline with a bounded number of pages in flight"""
+    def __init__(self, parser='lxml', workers=None, max_pending=None, report=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self.report = report
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(parser,),
+                                             mp_context=multiprocessing.get_context(START_METHOD))
+
+    def parse(self, html, username, last_seen_id, cutoff, max_tweets, seen_urls=()):
+        """Parse a page in a worker; blocks while max_pending pages are already in flight"""
+        started = time.perf_counter()
+        with self._slots:
+            if self.report:
+                self.report.add_time('parse_queue_wait', time.perf_counter() - started)
+            future = self._executor.submit(_parse_in_worker, html, username, last_seen_id, cutoff,
+                                           max_tweets, tuple(seen_urls))
+            return future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
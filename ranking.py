@@ -0,0 +1,149 @@
+"""Streaming top-K ranking of tweets.
+
+TopK keeps only the best K tweets seen so far in a bounded heap, so memory
+stays O(K) no matter how many tweets are fed in, and snapshot() returns the
+current ranking at any time. Scoring is a plain function of a Tweet;
+SCORERS maps the names accepted on the command line to factories for them.
+"""
+import heapq
+import itertools
+import time
+
+from columnar import COLUMN_SCORERS, ColumnarRanking
+
+
+def engagement_score(tweet):
+    """likes + retweets*2 + replies (retweets weighted more)"""
+    return tweet.engagement
+
+
+def time_decayed(half_life_hours=6.0, base=engagement_score, now=None):
+    """Score that halves every half_life_hours of tweet age (now is epoch seconds)"""
+    now = now or time.time()
+
+    def score(tweet):
+        age_hours = max(0.0, (now - tweet.timestamp) / 3600)
+        return base(tweet) * 0.5 ** (age_hours / half_life_hours)
+
+    return score
+
+
+SCORERS = {
+    'engagement': lambda: engagement_score,
+    'decayed': time_decayed
+}
+
+
+def get_scorer(name='engagement'):
+    return SCORERS[name]()
+
+
+# Every score name accepted anywhere; the columnar-only ones need NumPy
+SCORE_NAMES = sorted(set(SCORERS) | set(COLUMN_SCORERS))
+_numpy_warned = False
+
+
+def make_ranking(k=100, score='engagement', max_per_author=None, groups=None, group_quota=None):
+    """TopK, or ColumnarRanking (columnar.py) for scores and quotas that need whole-batch statistics"""
+    global _numpy_warned
+    if score in SCORERS and not group_quota:
+        return TopK(k, get_scorer(score), max_per_author)
+    try:
+        return ColumnarRanking(k, score, max_per_author, groups, group_quota)
+    except ImportError as e:
+        if not _numpy_warned:
+            print(f"Ranking by '{score}' needs NumPy ({e}); using engagement without quotas")
+            _numpy_warned = True
+        return TopK(k, get_scorer('engagement'), max_per_author)
+
+
+class _Entry:
+    __slots__ = ('score', 'order', 'tweet', 'alive')
+
+    def __init__(self, score, order, tweet):
+        self.score = score
+        self.order = order
+        self.tweet = tweet
+        self.alive = True
+
+    def __lt__(self, other):
+        # "Less" means ranks lower: smaller score, or later arrival on a tie
+        if self.score != other.score:
+            return self.score < other.score
+        return self.order > other.order
+
+
+class TopK:
+    """Bounded min-heap of the K best tweets, optionally capped per author"""
+    def __init__(self, k=100, score=engagement_score, max_per_author=None):
+        self.k = k
+        self.score = score
+        self.max_per_author = max_per_author
+        self.seen = 0
+        self._heap = []
+        self._size = 0
+        self._counter = itertools.count()
+        # author -> min-heap of that author's entries (may hold evicted ones)
+        self._by_author = {}
+        self._author_count = {}
+
+    def __len__(self):
+        return self._size
+
+    def _evict(self, entry):
+        entry.alive = False
+        self._size -= 1
+        self._author_count[entry.tweet.author] -= 1
+
+    def _peek(self, heap):
+        """Weakest live entry of a heap, dropping evicted ones on the way"""
+        while heap and not heap[0].alive:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _compact(self, heap, limit):
+        # Evicted entries are removed lazily; rebuild before they outnumber live ones
+        if len(heap) > 2 * limit:
+            heap[:] = [e for e in heap if e.alive]
+            heapq.heapify(heap)
+
+    def add(self, tweet, order=None):
+        """Offer a tweet; returns True if it is currently in the top K
+
+        order breaks score ties (lower ranks first) and defaults to arrival order.
+        """
+        self.seen += 1
+        if self.k <= 0:
+            return False
+        entry = _Entry(self.score(tweet), next(self._counter) if order is None else order, tweet)
+        author = tweet.author
+
+        if self.max_per_author and self._author_count.get(author, 0) >= self.max_per_author:
+            # Author is at the cap: only replace that author's weakest tweet
+            weakest = self._peek(self._by_author[author])
+            if not weakest < entry:
+                return False
+            self._evict(weakest)
+        elif self._size >= self.k:
+            weakest = self._peek(self._heap)
+            if not weakest < entry:
+                return False
+            self._evict(weakest)
+
+        heapq.heappush(self._heap, entry)
+        self._size += 1
+        self._compact(self._heap, self.k)
+        self._author_count[author] = self._author_count.get(author, 0) + 1
+        if self.max_per_author:
+            bucket = self._by_author.setdefault(author, [])
+            heapq.heappush(bucket, entry)
+            self._compact(bucket, self.max_per_author)
+        return True
+
+    def extend(self, tweets):
+        for tweet in tweets:
+            self.add(tweet)
+
+    def snapshot(self):
+        """Current top K, best first"""
+        return [e.tweet for e in sorted((e for e in self._heap if e.alive), reverse=True)]
@@ -0,0 +1,109 @@
+"""Per-host adaptive rate limiting (AIMD token bucket).
+
+Each Nitter host gets a token bucket whose rate is adjusted as responses
+come in: every success adds a little back (additive increase, up to the
+configured ceiling), every 429/503 halves it (multiplicative decrease) and
+blocks the host for the server's Retry-After, or an exponential backoff with
+full jitter if it didn't send one.
+"""
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value, now=None):
+    """Retry-After header (seconds or HTTP date) -> seconds to wait, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class TokenBucket:
+    """Per-host request budget; callers reserve a token and sleep until it is due"""
+    def __init__(self, rate=1.0, capacity=2):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a token would be available if one were taken now"""
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def reserve(self, now):
+        """Take a token (possibly going into debt) and return how long to wait for it"""
+        wait = self.wait_time(now)
+        self.tokens -= 1
+        return wait
+
+
+class AdaptiveBucket(TokenBucket):
+    """Token bucket whose rate follows AIMD on success / throttle signals"""
+    def __init__(self, rate=1.0, capacity=2, min_rate=0.05, decrease=0.5,
+                 base_backoff=2.0, max_backoff=120.0):
+        super().__init__(rate, capacity)
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.increase = rate / 20  # ~20 successes to recover from a full stop
+        self.decrease = decrease
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.blocked_until = 0.0
+        # Logged per run
+        self.lowest_rate = rate
+        self.throttles = 0
+        self.backoff_seconds = 0.0
+
+    def on_success(self, now):
+        self._refill(now)
+        self.failures = 0
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, now, retry_after=None):
+        """429/503: cut the rate and block the host; returns the backoff applied"""
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.lowest_rate = min(self.lowest_rate, self.rate)
+        self.throttles += 1
+        return self._back_off(now, retry_after)
+
+    def on_error(self, now):
+        """Other 5xx or connection errors: back off without touching the rate"""
+        return self._back_off(now, None)
+
+    def _back_off(self, now, retry_after):
+        self.failures += 1
+        if retry_after is not None:
+            # Honour the server, plus a little jitter so workers don't return in lockstep
+            delay = min(self.max_backoff, retry_after) + random.uniform(0, 1)
+        else:
+            delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** (self.failures - 1)))
+        self.blocked_until = max(self.blocked_until, now + delay)
+        self.backoff_seconds += delay
+        return delay
+
+    def state(self):
+        return {
+            'rate': round(self.rate, 3),
+            'max_rate': round(self.max_rate, 3),
+            'lowest_rate': round(self.lowest_rate, 3),
+            'throttles': self.throttles,
+            'backoff_seconds': round(self.backoff_seconds, 2)
+        }
@@ -0,0 +1,174 @@
+"""On-disk cache of Nitter responses (list and profile pages).
+
+Bodies are stored content-addressed under blobs/<sha256 of body>. Each
+request path has a small JSON entry (named by the sha256 of the path)
+pointing at its blob, with the status, validators and fetch time. Every
+file is written to a temp file and renamed into place, so a run that dies
+halfway leaves only complete entries behind. The next run within the TTL
+replays them without touching the network.
+
+The cache is bounded: once the blobs exceed max_bytes, blobs no entry points
+at are deleted, then the least recently used entries (an entry's mtime is
+bumped on every hit) until it is back under 80% of the limit. A blob is also
+deleted as soon as the last entry pointing at it is overwritten.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+
+class CachedResponse:
+    """Enough of a requests.Response for the scraper to use a cached page"""
+    def __init__(self, status_code, content=b'', headers=None, instance=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.instance = instance
+        self.elapsed = timedelta(0)
+        self.wire_bytes = 0
+        self.from_cache = True
+
+
+class ResponseCache:
+    def __init__(self, directory='.http_cache', ttl=3600, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(directory, 'blobs')
+        self.entry_dir = os.path.join(directory, 'entries')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.entry_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # blob -> number of entries pointing at it; read from disk on first put
+        self._refs = None
+        self.size = sum(entry.stat().st_size for entry in os.scandir(self.blob_dir) if entry.is_file())
+
+    def _entry_file(self, path):
+        return os.path.join(self.entry_dir, hashlib.sha256(path.encode('utf-8')).hexdigest() + '.json')
+
+    def _write_atomic(self, target, data):
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, target)
+        except BaseException:
+            os.unlink(tmp_file)
+            raise
+
+    def _live_entries(self):
+        """Entries oldest first, and {entry path: blob} for those that still parse"""
+        entries = sorted(
+            (e for e in os.scandir(self.entry_dir) if e.name.endswith('.json')),
+            key=lambda e: e.stat().st_mtime
+        )
+        live = {}
+        for e in entries:
+            try:
+                with open(e.path, 'r') as f:
+                    live[e.path] = json.load(f)['blob']
+            except (OSError, ValueError, KeyError):
+                os.unlink(e.path)
+        return entries, live
+
+    def _blob_refs(self):
+        if self._refs is None:
+            self._refs = Counter(self._live_entries()[1].values())
+        return self._refs
+
+    def _release(self, blob):
+        """Drop one reference to blob, deleting it once nothing points at it"""
+        self._refs[blob] -= 1
+        if self._refs[blob] > 0:
+            return
+        del self._refs[blob]
+        blob_file = os.path.join(self.blob_dir, blob)
+        try:
+            size = os.path.getsize(blob_file)
+            os.unlink(blob_file)
+        except OSError:
+            return
+        self.size -= size
+
+    def _current_blob(self, entry_file):
+        try:
+            with open(entry_file, 'r') as f:
+                return json.load(f)['blob']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def get(self, path, max_age=-1):
+        """Cached response for path, or None if missing or older than max_age seconds
+
+        max_age defaults to the cache TTL; None accepts entries of any age.
+        """
+        if max_age == -1:
+            max_age = self.ttl
+        entry_file = self._entry_file(path)
+        try:
+            with open(entry_file, 'r') as f:
+                entry = json.load(f)
+            if max_age is not None and time.time() - entry['fetched_at'] > max_age:
+                return None
+            with open(os.path.join(self.blob_dir, entry['blob']), 'rb') as f:
+                body = f.read()
+            os.utime(entry_file)  # LRU: mark as recently used
+        except (OSError, ValueError, KeyError):
+            return None
+        return CachedResponse(entry['status'], body, entry['headers'], entry['instance'])
+
+    def put(self, path, response, instance=None):
+        """Store a response body and its entry"""
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        blob_file = os.path.join(self.blob_dir, digest)
+        entry = {
+            'path': path,
+            'status': response.status_code,
+            'headers': {
+                name: response.headers.get(name)
+                for name in ('ETag', 'Last-Modified', 'Content-Type')
+                if response.headers.get(name)
+            },
+            'instance': instance,
+            'blob': digest,
+            'fetched_at': time.time()
+        }
+        entry_file = self._entry_file(path)
+        with self._lock:
+            refs = self._blob_refs()
+            old_blob = self._current_blob(entry_file)
+            if not os.path.exists(blob_file):
+                self._write_atomic(blob_file, body)
+                self.size += len(body)
+            self._write_atomic(entry_file, json.dumps(entry).encode('utf-8'))
+            if old_blob != digest:
+                refs[digest] += 1
+                if old_blob is not None:
+                    self._release(old_blob)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop blobs nothing points at, then least recently used entries"""
+        entries, live = self._live_entries()
+        self._refs = Counter(live.values())
+        for b in os.scandir(self.blob_dir):
+            if b.name.endswith('.tmp') or b.name in self._refs:
+                continue
+            self.size -= b.stat().st_size
+            os.unlink(b.path)
+
+        target = self.max_bytes * 0.8
+        for e in entries:
+            if self.size <= target:
+                break
+            if e.path not in live:
+                continue
+            os.unlink(e.path)
+            self._release(live.pop(e.path))
@@ -0,0 +1,218 @@
+"""Streaming feed writers: RSS 2.0, Atom 1.0 and JSON Feed 1.1.
+
+Writes each feed incrementally (lxml's xmlfile for the XML formats): the
+header first, then one entry per tweet as the iterable yields it. Memory stays flat
+however many entries there are, unlike feedgen, which builds the whole
+object graph before serialising. The output goes to a temp file that
+replaces the target only once complete, so readers never see a half feed.
+
+Tweet text is HTML-escaped before it goes into the description markup; the
+XML layer then escapes that markup once more, as RSS readers expect. Each
+tweet's title and markup are rendered once (FeedEntry) and reused by every
+feed and format it appears in.
+"""
+import html
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from lxml import etree
+
+FEED_LINK = 'https://yourdomain.com/tech-ai-twitter'
+FEED_SUBTITLE = 'Daily highlights from curated Twitter lists'
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+
+# Control characters XML 1.0 doesn't allow (lxml refuses them outright)
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# RFC 822 names; strftime's %a/%b follow the locale
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def rfc822(timestamp):
+    """Epoch seconds -> 'Tue, 14 Nov 2023 22:13:20 +0000'"""
+    t = time.gmtime(timestamp)
+    return (f"{DAYS[t.tm_wday]}, {t.tm_mday:02d} {MONTHS[t.tm_mon - 1]} {t.tm_year} "
+            f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} +0000")
+
+
+def rfc3339(timestamp):
+    """Epoch seconds -> '2023-11-14T22:13:20Z'"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(timestamp))
+
+
+def xml_safe(text):
+    return INVALID_XML_CHARS.sub('', text)
+
+
+def entry_title(tweet):
+    title_text = tweet.text[:120]
+    if len(tweet.text) > 120:
+        title_text += '...'
+    return xml_safe(f"@{tweet.author}: {title_text}")
+
+
+def entry_html(tweet):
+    """Description markup for one tweet, with the tweet's own text escaped"""
+    url = html.escape(tweet.url)
+    return xml_safe(f"""
+            <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;">
+                <p style="font-size: 15px; line-height: 1.5; margin: 0 0 12px 0;">{html.escape(tweet.text)}</p>
+                <p style="color: #536471; font-size: 14px; margin: 0;">
+                    <strong>@{html.escape(tweet.author)}</strong> ·
+                    👍 {tweet.likes:,} ·
+                    🔄 {tweet.retweets:,} ·
+                    💬 {tweet.replies:,}
+                </p>
+                <p style="margin-top: 12px;">
+                    <a href="{url}" style="color: #1d9bf0; text-decoration: none;">View on Twitter →</a>
+                </p>
+            </div>
+            """)
+
+
+class FeedEntry:
+    """A tweet with its title and description HTML, rendered once and shared by every feed and format"""
+    __slots__ = ('tweet', 'title', 'html')
+
+    def __init__(self, tweet):
+        self.tweet = tweet
+        self.title = entry_title(tweet)
+        self.html = entry_html(tweet)
+
+
+def render_entries(tweets, cache=None):
+    """Yield a FeedEntry per tweet, reusing ones already in cache (a dict keyed by URL)"""
+    for tweet in tweets:
+        if cache is None:
+            yield FeedEntry(tweet)
+            continue
+        entry = cache.get(tweet.url)
+        if entry is None:
+            entry = cache[tweet.url] = FeedEntry(tweet)
+        yield entry
+
+
+@contextmanager
+def _atomic(output_file):
+    tmp_file = f"{output_file}.tmp"
+    try:
+        yield tmp_file
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def _text_element(tag, text, **attrib):
+    el = etree.Element(tag, **attrib)
+    el.text = text
+    return el
+
+
+def write_rss(entries, output_file, title, subtitle=FEED_SUBTITLE, link=FEED_LINK):
+    """Stream FeedEntries (any iterable) into an RSS 2.0 file; returns the number of entries"""
+    count = 0
+    with _atomic(output_file) as tmp_file:
+        with etree.xmlfile(tmp_file, encoding='UTF-8') as xf:
+            xf.write_declaration()
+            with xf.element('rss', version='2.0'):
+                with xf.element('channel'):
+                    xf.write(_text_element('title', xml_safe(title)))
+                    xf.write(_text_element('link', link))
+                    xf.write(_text_element('description', subtitle))
+                    xf.write(_text_element('docs', 'http://www.rssboard.org/rss-specification'))
+                    xf.write(_text_element('generator', 'tech-twitter-digest'))
+                    xf.write(_text_element('language', 'en'))
+                    xf.write(_text_element('lastBuildDate', rfc822(time.time())))
+                    for entry in entries:
+                        tweet = entry.tweet
+                        item = etree.Element('item')
+                        etree.SubElement(item, 'title').text = entry.title
+                        etree.SubElement(item, 'link').text = tweet.url
+                        etree.SubElement(item, 'description').text = entry.html
+                        etree.SubElement(item, 'guid', isPermaLink='false').text = tweet.url
+                        etree.SubElement(item, 'pubDate').text = rfc822(tweet.timestamp)
+                        xf.write(item)
+                        count += 1
+    return count
+
+
+def write_atom(entries, output_file, title, subtitle=FEED_SUBTITLE, link=FEED_LINK):
+    """Stream FeedEntries into an Atom 1.0 file; returns the number of entries"""
+    ns = '{%s}' % ATOM_NS
+    nsmap = {None: ATOM_NS}
+    count = 0
+    with _atomic(output_file) as tmp_file:
+        with etree.xmlfile(tmp_file, encoding='UTF-8') as xf:
+            xf.write_declaration()
+            with xf.element(ns + 'feed', nsmap=nsmap):
+                xf.write(_text_element(ns + 'id', link, nsmap=nsmap))
+                xf.write(_text_element(ns + 'title', xml_safe(title), nsmap=nsmap))
+                xf.write(_text_element(ns + 'subtitle', subtitle, nsmap=nsmap))
+                xf.write(etree.Element(ns + 'link', href=link, rel='alternate', nsmap=nsmap))
+                xf.write(_text_element(ns + 'updated', rfc3339(time.time()), nsmap=nsmap))
+                xf.write(_text_element(ns + 'generator', 'tech-twitter-digest', nsmap=nsmap))
+                for entry in entries:
+                    tweet = entry.tweet
+                    item = etree.Element(ns + 'entry', nsmap=nsmap)
+                    etree.SubElement(item, ns + 'id').text = tweet.url
+                    etree.SubElement(item, ns + 'title').text = entry.title
+                    etree.SubElement(item, ns + 'link', href=tweet.url, rel='alternate')
+                    etree.SubElement(item, ns + 'published').text = rfc3339(tweet.timestamp)
+                    etree.SubElement(item, ns + 'updated').text = rfc3339(tweet.timestamp)
+                    etree.SubElement(etree.SubElement(item, ns + 'author'), ns + 'name').text = f"@{tweet.author}"
+                    etree.SubElement(item, ns + 'content', type='html').text = entry.html
+                    xf.write(item)
+                    count += 1
+    return count
+
+
+def write_json_feed(entries, output_file, title, subtitle=FEED_SUBTITLE, link=FEED_LINK):
+    """Stream FeedEntries into a JSON Feed 1.1 file; returns the number of entries"""
+    header = json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': title,
+        'home_page_url': link,
+        'description': subtitle,
+        'language': 'en'
+    }, ensure_ascii=False)
+    count = 0
+    with _atomic(output_file) as tmp_file:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            # Header object minus its closing brace, then the items one at a time
+            f.write(header[:-1] + ', "items": [')
+            for entry in entries:
+                tweet = entry.tweet
+                if count:
+                    f.write(', ')
+                f.write(json.dumps({
+                    'id': tweet.url,
+                    'url': tweet.url,
+                    'title': entry.title,
+                    'content_html': entry.html,
+                    'date_published': rfc3339(tweet.timestamp),
+                    'authors': [{'name': f"@{tweet.author}"}],
+                    '_engagement': {'likes': tweet.likes, 'retweets': tweet.retweets, 'replies': tweet.replies}
+                }, ensure_ascii=False))
+                count += 1
+            f.write(']}\n')
+    return count
+
+
+WRITERS = {
+    'rss': write_rss,
+    'atom': write_atom,
+    'json': write_json_feed
+}
+
+# Output file name for each format, from the RSS file's stem
+SUFFIXES = {
+    'rss': '.xml',
+    'atom': '.atom.xml',
+    'json': '.json'
+}
@@ -0,0 +1,91 @@
+"""Splitting a run over several workers.
+
+`--shard i/N` makes a run fetch only the accounts whose stable hash falls in
+shard i (0-based) of N, and write a partial file instead of the feed:
+
+    {"shard": 0, "shards": 4, "accounts": [...], "positions": [...], "tweets": [...], "account_state": {...}}
+
+`--merge` reads the partial files back, de-duplicates tweets by URL, and the
+generator ranks them and writes the feed. Accounts keep their position in
+the full list so score ties break exactly as in an unsharded run. Every
+account lives in exactly one shard, so per-account state merges without
+conflicts.
+"""
+import argparse
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+
+from tweet import Tweet
+
+
+def shard_of(username, shards):
+    """Shard index of an account; stable across runs, machines and Python versions"""
+    return zlib.crc32(username.lower().encode('utf-8')) % shards
+
+
+def parse_shard(value):
+    """'2/4' -> (2, 4), for argparse"""
+    try:
+        index, shards = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if shards < 1 or not 0 <= index < shards:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..N-1, got {value!r}")
+    return index, shards
+
+
+def partial_path(shard):
+    index, shards = shard
+    return f"tweets_shard_{index}_of_{shards}.json"
+
+
+def write_partial(path, shard, accounts, positions, tweets, account_state):
+    """Write one shard's results atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'shard': shard[0],
+            'shards': shard[1],
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'accounts': accounts,
+            'positions': positions,
+            'tweets': [t.to_dict() for t in tweets],
+            'account_state': account_state
+        }, f)
+    os.replace(tmp_path, path)
+    print(f"✓ Shard {shard[0]}/{shard[1]}: {len(tweets)} tweets from {len(accounts)} accounts written to {path}")
+
+
+def load_partials(paths):
+    """Combine shard files -> (tweets de-duplicated by URL, accounts in list order, account_state)
+
+    If the same tweet shows up twice (e.g. a shard re-run), the copy with the
+    higher engagement wins. Missing shards are reported but don't stop the merge.
+    """
+    tweets = {}
+    accounts = {}
+    account_state = {}
+    shards_seen = set()
+    expected = None
+
+    for path in paths:
+        with open(path, 'r') as f:
+            partial = json.load(f)
+        shards_seen.add(partial['shard'])
+        expected = partial['shards']
+        accounts.update(zip(partial['accounts'], partial['positions']))
+        account_state.update(partial.get('account_state', {}))
+        for data in partial['tweets']:
+            tweet = Tweet.from_dict(data)
+            current = tweets.get(tweet.url)
+            if current is None or tweet.engagement > current.engagement:
+                tweets[tweet.url] = tweet
+
+    if expected is not None:
+        missing = sorted(set(range(expected)) - shards_seen)
+        if missing:
+            print(f"⚠️  Missing shards: {', '.join(f'{i}/{expected}' for i in missing)}")
+    print(f"Merged {len(paths)} shard files: {len(tweets)} unique tweets from {len(accounts)} accounts")
+    return list(tweets.values()), sorted(accounts, key=accounts.get), account_state
@@ -0,0 +1,127 @@
+"""HTTP transport for the scraper.
+
+make_session() returns a requests.Session with connection pools sized for the
+number of parallel fetches, keep-alive reuse, retries with backoff for
+connection failures (HTTP status failover is InstancePool's job) and an
+explicit Accept-Encoding for every compression urllib3 can decode here
+(gzip/deflate, plus br and zstd when brotli / zstandard are installed).
+
+With http2=True it returns an HttpxSession instead: an httpx client with
+HTTP/2 enabled, so parallel requests to one mirror are multiplexed over a
+single connection. It needs `pip install httpx[http2]`; without it we fall
+back to requests.
+
+Both expose stats() for the run report: requests sent, connections opened
+(requests only) and bytes read off the wire before decompression.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+
+def _retry_policy(retries):
+    # Only connect errors are retried here; 429/5xx go back to the pool for failover
+    return Retry(total=retries, connect=retries, read=0, status=0, redirect=5,
+                 backoff_factor=0.3, allowed_methods=frozenset(['GET', 'HEAD']),
+                 raise_on_status=False)
+
+
+class PooledSession(requests.Session):
+    """requests.Session with per-host pool sizing, connect retries and wire-byte accounting"""
+    def __init__(self, pool_size=10, hosts=10, retries=2):
+        super().__init__()
+        self.adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size,
+                                   max_retries=_retry_policy(retries))
+        self.mount('http://', self.adapter)
+        self.mount('https://', self.adapter)
+        self.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive'
+        })
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.wire_bytes = 0
+
+    def request(self, *args, **kwargs):
+        response = super().request(*args, **kwargs)
+        # raw.tell() counts bytes read from the socket, i.e. before decompression
+        wire = response.raw.tell() if response.raw is not None else len(response.content)
+        with self._lock:
+            self.requests_sent += 1
+            self.wire_bytes += wire or 0
+        response.wire_bytes = wire
+        return response
+
+    def stats(self):
+        pools = self.adapter.poolmanager.pools
+        opened = sum(pools[key].num_connections for key in list(pools.keys()))
+        return {
+            'transport': 'requests',
+            'requests': self.requests_sent,
+            'connections_opened': opened,
+            'connection_reuse': round(1 - opened / self.requests_sent, 3) if self.requests_sent else 0.0,
+            'wire_bytes': self.wire_bytes
+        }
+
+
+class HttpxSession:
+    """Minimal requests-like wrapper over httpx.Client with HTTP/2"""
+    def __init__(self, pool_size=10, retries=2):
+        import httpx
+        self.httpx = httpx
+        self.client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=httpx.HTTPTransport(http2=True, retries=retries),
+            follow_redirects=True
+        )
+        self.headers = self.client.headers
+        self.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING})
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.wire_bytes = 0
+        self.http_versions = {}
+
+    def get(self, url, timeout=15, headers=None):
+        if isinstance(timeout, tuple):
+            timeout = self.httpx.Timeout(timeout[1], connect=timeout[0])
+        try:
+            response = self.client.get(url, timeout=timeout, headers=headers)
+        except self.httpx.HTTPError as e:
+            # Callers only know about requests' exceptions
+            raise requests.ConnectionError(str(e)) from e
+        with self._lock:
+            self.requests_sent += 1
+            self.wire_bytes += response.num_bytes_downloaded
+            self.http_versions[response.http_version] = self.http_versions.get(response.http_version, 0) + 1
+        response.wire_bytes = response.num_bytes_downloaded
+        return response
+
+    def close(self):
+        self.client.close()
+
+    def stats(self):
+        return {
+            'transport': 'httpx',
+            'requests': self.requests_sent,
+            'http_versions': dict(self.http_versions),
+            'wire_bytes': self.wire_bytes
+        }
+
+
+def make_session(pool_size=10, hosts=10, retries=2, http2=False):
+    """Session for fetching from Nitter; see the module docstring"""
+    if http2:
+        try:
+            import h2  # noqa: F401  (httpx only speaks HTTP/2 with it installed)
+            return HttpxSession(pool_size=pool_size, retries=retries)
+        except ImportError:
+            print("httpx[http2] is not installed (pip install 'httpx[http2]'); using requests")
+    return PooledSession(pool_size=pool_size, hosts=hosts, retries=retries)
@@ -0,0 +1,37 @@
+"""Compact tweet record shared by the scraper, ranking, store and feed writer."""
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+
+@dataclass(frozen=True, slots=True)
+class Tweet:
+    author: str
+    text: str
+    url: str
+    likes: int = 0
+    retweets: int = 0
+    replies: int = 0
+    timestamp: float = 0.0  # epoch seconds (UTC)
+
+    @property
+    def engagement(self):
+        return self.likes + (self.retweets * 2) + self.replies  # Weight retweets more
+
+    @property
+    def created_at(self):
+        return datetime.fromtimestamp(self.timestamp, timezone.utc)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data.pop('engagement', None)
+        # Older state files stored an ISO created_at instead of the epoch timestamp
+        if 'created_at' in data:
+            created_at = datetime.fromisoformat(data.pop('created_at'))
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            data.setdefault('timestamp', created_at.timestamp())
+        return cls(**data)
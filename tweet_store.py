@@ -0,0 +1,214 @@
+"""On-disk tweet store (SQLite).
+
+Tweets are upserted by URL on every run, so their stats stay current and
+they outlive the 24-hour scrape window. Digest queries (daily, weekly,
+per-list) read straight from the store without touching the network.
+
+assign_stories() files each new tweet under a story, the URL of the first
+tweet of its near-duplicate cluster (dedup.py), when the tweets are stored.
+A deduplicated digest is then a GROUP BY in SQL: it never has to load and
+cluster the whole period at startup.
+"""
+import sqlite3
+import time
+
+from tweet import Tweet
+
+PERIODS = {
+    'daily': 1,
+    'weekly': 7
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    url TEXT PRIMARY KEY,
+    author TEXT NOT NULL,
+    text TEXT NOT NULL,
+    likes INTEGER NOT NULL DEFAULT 0,
+    retweets INTEGER NOT NULL DEFAULT 0,
+    replies INTEGER NOT NULL DEFAULT 0,
+    engagement INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    story TEXT
+);
+CREATE INDEX IF NOT EXISTS tweets_author ON tweets (author, created_at);
+CREATE INDEX IF NOT EXISTS tweets_created_at ON tweets (created_at);
+CREATE INDEX IF NOT EXISTS tweets_engagement ON tweets (engagement DESC);
+CREATE TABLE IF NOT EXISTS list_members (
+    list_id TEXT NOT NULL,
+    author TEXT NOT NULL,
+    PRIMARY KEY (list_id, author)
+);
+CREATE INDEX IF NOT EXISTS list_members_author ON list_members (author);
+"""
+
+COLUMNS = 'url, author, text, likes, retweets, replies, created_at'
+
+# One row per story: its most engaging tweet (the earliest on ties) carrying the
+# summed stats of all its tweets, as NearDuplicates.results() would yield it.
+# Tweets without a story (stored with --no-dedup) stand alone.
+STORIES = """
+SELECT url, author, text, likes, retweets, replies, created_at, engagement, first FROM (
+    SELECT url, author, text, created_at,
+           SUM(likes) OVER story AS likes,
+           SUM(retweets) OVER story AS retweets,
+           SUM(replies) OVER story AS replies,
+           SUM(engagement) OVER story AS engagement,
+           MIN(created_at) OVER story AS first,
+           ROW_NUMBER() OVER (story ORDER BY engagement DESC, created_at) AS n
+    FROM tweets{where}
+    WINDOW story AS (PARTITION BY COALESCE(story, url))
+) WHERE n = 1
+"""
+
+
+def list_id_from_url(list_url):
+    """https://x.com/i/lists/1539497752140206080 -> '1539497752140206080'"""
+    return list_url.split('/lists/')[-1].strip().strip('/')
+
+
+class TweetStore:
+    """SQLite-backed tweet history; use from a single thread"""
+    def __init__(self, path='tweets.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        # Stores from before stories were kept
+        if 'story' not in {row['name'] for row in self.conn.execute('PRAGMA table_info(tweets)')}:
+            self.conn.execute('ALTER TABLE tweets ADD COLUMN story TEXT')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS tweets_story ON tweets (story)')
+
+    def close(self):
+        self.conn.close()
+
+    def upsert(self, tweets):
+        """Insert new tweets and refresh stats of ones already stored"""
+        now = time.time()
+        rows = [
+            (t.url, t.author, t.text, t.likes, t.retweets, t.replies, t.engagement, t.timestamp, now, now)
+            for t in tweets
+        ]
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO tweets (url, author, text, likes, retweets, replies, engagement,
+                                    created_at, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    text = excluded.text,
+                    likes = excluded.likes,
+                    retweets = excluded.retweets,
+                    replies = excluded.replies,
+                    engagement = excluded.engagement,
+                    last_seen = excluded.last_seen
+            """, rows)
+        return len(rows)
+
+    def assign_stories(self, threshold=0.5, period='weekly'):
+        """Give the period's tweets without a story the story of their near-duplicate cluster
+
+        The period's tweets are clustered oldest first, so a new tweet joins
+        the story of a stored one it duplicates, or starts its own. Returns
+        how many tweets were assigned.
+        """
+        since = self.since(period)
+        if not self.conn.execute('SELECT 1 FROM tweets WHERE story IS NULL AND created_at >= ? LIMIT 1',
+                                 (since,)).fetchone():
+            return 0
+        from dedup import NearDuplicates
+        clusters = NearDuplicates(threshold)
+        stories = {}  # cluster index -> story
+        assigned = []
+        rows = self.conn.execute(f'SELECT {COLUMNS}, story FROM tweets WHERE created_at >= ? '
+                                 'ORDER BY created_at, url', (since,))
+        for row in rows:
+            story = stories.setdefault(clusters.add(self._tweet(row)), row['story'] or row['url'])
+            if row['story'] is None:
+                assigned.append((story, row['url']))
+        with self.conn:
+            self.conn.executemany('UPDATE tweets SET story = ? WHERE url = ?', assigned)
+        return len(assigned)
+
+    def set_list_members(self, list_id, authors):
+        """Replace the stored membership of one list"""
+        with self.conn:
+            self.conn.execute('DELETE FROM list_members WHERE list_id = ?', (list_id,))
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO list_members (list_id, author) VALUES (?, ?)',
+                [(list_id, author) for author in authors]
+            )
+
+    def _where(self, since, list_id):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append('created_at >= ?')
+            params.append(since)
+        if list_id is not None:
+            clauses.append('author IN (SELECT author FROM list_members WHERE list_id = ?)')
+            params.append(list_id)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _tweet(self, row):
+        return Tweet(row['author'], row['text'], row['url'], row['likes'], row['retweets'],
+                     row['replies'], row['created_at'])
+
+    def top(self, since=None, list_id=None, limit=100):
+        """Most engaging tweets, using the engagement index"""
+        where, params = self._where(since, list_id)
+        rows = self.conn.execute(
+            f'SELECT {COLUMNS} FROM tweets{where} ORDER BY engagement DESC, created_at DESC LIMIT ?',
+            params + [limit]
+        )
+        return [self._tweet(row) for row in rows]
+
+    def top_stories(self, since=None, list_id=None, limit=100):
+        """Most engaging stories (see assign_stories), each as its merged lead tweet"""
+        where, params = self._where(since, list_id)
+        # Totals first, then the lead tweets of just those stories: sorting every row with
+        # its text, as STORIES does, costs several times more
+        totals = self.conn.execute(f"""
+            SELECT COALESCE(story, url) AS story, SUM(likes), SUM(retweets), SUM(replies),
+                   SUM(engagement) AS engagement, MIN(created_at) AS first
+            FROM tweets{where} GROUP BY 1 ORDER BY engagement DESC, first LIMIT ?
+        """, params + [limit]).fetchall()
+        if not totals:
+            return []
+        marks = ', '.join('?' * len(totals))
+        # Leads ranked on the narrow columns; only their rows are read in full
+        rows = self.conn.execute(f"""
+            SELECT {COLUMNS}, COALESCE(story, url) AS story FROM tweets WHERE rowid IN (
+                SELECT id FROM (
+                    SELECT rowid AS id, ROW_NUMBER() OVER (PARTITION BY COALESCE(story, url)
+                                                           ORDER BY engagement DESC, created_at) AS n
+                    FROM tweets{where}{' AND' if where else ' WHERE'} COALESCE(story, url) IN ({marks})
+                ) WHERE n = 1
+            )
+        """, params + [row['story'] for row in totals])
+        leads = {row['story']: row for row in rows}
+        return [
+            Tweet(lead['author'], lead['text'], lead['url'], row[1], row[2], row[3], lead['created_at'])
+            for row, lead in ((row, leads[row['story']]) for row in totals)
+        ]
+
+    def iter_stories(self, since=None, list_id=None):
+        """Stream matching stories as merged lead tweets, in order of their first tweet"""
+        where, params = self._where(since, list_id)
+        for row in self.conn.execute(STORIES.format(where=where) + ' ORDER BY first, url', params):
+            yield self._tweet(row)
+
+    def iter_tweets(self, since=None, list_id=None):
+        """Stream matching tweets, oldest first"""
+        where, params = self._where(since, list_id)
+        for row in self.conn.execute(f'SELECT {COLUMNS} FROM tweets{where} ORDER BY created_at', params):
+            yield self._tweet(row)
+
+    def since(self, period):
+        """Epoch cutoff for a named digest period"""
+        return time.time() - PERIODS[period] * 86400
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM tweets').fetchone()[0]